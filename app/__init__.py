@@ -0,0 +1,86 @@
+"""Fábrica da aplicação Pretitudes.
+
+Importar este pacote é barato: Drive, OAuth e Pillow só são carregados no
+primeiro uso e o esquema do banco é criado pelo comando `flask init-db`.
+"""
+import os
+import secrets
+from datetime import timedelta
+
+from dotenv import load_dotenv
+from flask import Flask
+
+
+def load_config(app):
+    is_prod = os.environ.get("isProd", "false").lower() == "true"
+    app.config['IS_PROD'] = is_prod
+
+    if is_prod:
+        app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get("DB_URL")
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+            'pool_pre_ping': True,
+            'pool_recycle': 280,
+            'pool_size': int(os.environ.get("DB_POOL_SIZE", "5")),
+            'max_overflow': int(os.environ.get("DB_MAX_OVERFLOW", "10")),
+        }
+        app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'
+        app.config['SESSION_COOKIE_SECURE'] = True
+    else:
+        # Fora de produção sempre o SQLite local: o .env costuma trazer o DB_URL de
+        # produção. Benchmarks passam o banco deles via create_app(config).
+        app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///pedagogico.db'
+
+    app.config['MAX_CONTENT_LENGTH'] = 32 * 1024 * 1024
+    app.config['SECRET_KEY'] = os.environ.get("SECRET_KEY") or secrets.token_hex(16)
+    app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(days=30)
+    app.config['GOOGLE_CLIENT_ID'] = os.environ.get("GOOGLE_CLIENT_ID")
+    app.config['GOOGLE_CLIENT_SECRET'] = os.environ.get("GOOGLE_CLIENT_SECRET")
+    # Sobrescrevíveis para apontar o app para um Drive local (ver bench/fake_drive.py).
+    app.config['DRIVE_API_URL'] = os.environ.get("DRIVE_API_URL", "https://www.googleapis.com").rstrip('/')
+    app.config['GOOGLE_TOKEN_URI'] = os.environ.get("GOOGLE_TOKEN_URI", "https://oauth2.googleapis.com/token")
+    # Conexões keep-alive ao Drive por processo e timeout de leitura do cdn_proxy.
+    app.config['DRIVE_HTTP_POOL_SIZE'] = int(os.environ.get("DRIVE_HTTP_POOL_SIZE", "50"))
+    app.config['DRIVE_MEDIA_TIMEOUT'] = float(os.environ.get("DRIVE_MEDIA_TIMEOUT", "30"))
+
+    # Coletor de lixo do Drive: intervalo entre varreduras do `flask drive-gc --loop`
+    # (rodado como processo à parte; ou `flask drive-gc` no cron), deletes por
+    # requisição batch, pausa entre batches e idade mínima do arquivo.
+    app.config['DRIVE_GC_INTERVAL'] = int(os.environ.get("DRIVE_GC_INTERVAL", "3600"))
+    app.config['DRIVE_GC_BATCH_SIZE'] = int(os.environ.get("DRIVE_GC_BATCH_SIZE", "50"))
+    app.config['DRIVE_GC_BATCH_PAUSE'] = float(os.environ.get("DRIVE_GC_BATCH_PAUSE", "1.0"))
+    app.config['DRIVE_GC_MIN_AGE'] = int(os.environ.get("DRIVE_GC_MIN_AGE", "3600"))
+
+    # Métricas: token opcional para o scraper do Prometheus e limite (ms) do log de
+    # requisições lentas com o detalhamento das consultas SQL (0 desativa).
+    app.config['METRICS_TOKEN'] = os.environ.get("METRICS_TOKEN")
+    # Diretório compartilhado entre os workers para somar as métricas (ver app/metrics.py).
+    app.config['METRICS_DIR'] = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    app.config['SLOW_REQUEST_MS'] = int(os.environ.get("SLOW_REQUEST_MS", "0"))
+
+    # Compressão das respostas (ver app/assets.py): tamanho mínimo em bytes e
+    # níveis usados nas respostas dinâmicas; os estáticos usam o nível máximo.
+    app.config['COMPRESS_MIN_SIZE'] = int(os.environ.get("COMPRESS_MIN_SIZE", "1024"))
+    app.config['GZIP_LEVEL'] = int(os.environ.get("GZIP_LEVEL", "6"))
+    app.config['BROTLI_LEVEL'] = int(os.environ.get("BROTLI_LEVEL", "5"))
+
+
+def create_app(config=None):
+    load_dotenv()
+
+    app = Flask(__name__)
+    load_config(app)
+    if config:
+        app.config.update(config)
+
+    from app import assets, metrics
+    from app.app import bp, db, login_manager
+
+    db.init_app(app)
+    login_manager.init_app(app)
+    app.register_blueprint(bp)
+    assets.init_app(app)
+
+    if app.config['METRICS_DIR']:
+        metrics.registry.enable_multiprocess(app.config['METRICS_DIR'])
+
+    return app
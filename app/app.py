@@ -1,72 +1,100 @@
 import os
 import uuid
+import hashlib
 import secrets
 import string
 import json
 import io
-import requests
-from dotenv import load_dotenv
-from datetime import datetime, timedelta
-from PIL import Image, ImageOps
-import pillow_heif
-
-pillow_heif.register_heif_opener()
-
-from flask import Flask, render_template, request, jsonify, url_for, redirect, Response, stream_with_context, session
+import base64
+import time
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+import click
+from flask import Blueprint, current_app, render_template, request, jsonify, url_for, redirect, Response, session, g, has_request_context
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event, inspect as sa_inspect
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import joinedload
+from sqlalchemy.exc import IntegrityError
 from flask_login import UserMixin, LoginManager, login_user, logout_user, login_required, current_user
 from werkzeug.security import generate_password_hash, check_password_hash
 from werkzeug.utils import secure_filename
 
-from google.oauth2.credentials import Credentials
-from google.auth.transport.requests import Request as GoogleRequest
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseUpload
-from authlib.integrations.flask_client import OAuth
-
-load_dotenv()
+from app import metrics
 
-app = Flask(__name__)
-
-is_prod = os.environ.get("isProd", "false").lower() == "true"
-app.config['IS_PROD'] = is_prod
-
-if is_prod:
-    app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get("DB_URL")
-    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
-        'pool_pre_ping': True,
-        'pool_recycle': 280,
-    }
-    app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'
-    app.config['SESSION_COOKIE_SECURE'] = True
-else:
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///pedagogico.db'
+# Drive (googleapiclient), OAuth (authlib) e Pillow custam centenas de ms para
+# importar; ficam para o primeiro uso ou para preload_heavy_modules().
 
-app.config['MAX_CONTENT_LENGTH'] = 32 * 1024 * 1024
-app.config['SECRET_KEY'] = os.environ.get("SECRET_KEY") or secrets.token_hex(16)
-app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(days=30)
-app.config['GOOGLE_CLIENT_ID'] = os.environ.get("GOOGLE_CLIENT_ID")
-app.config['GOOGLE_CLIENT_SECRET'] = os.environ.get("GOOGLE_CLIENT_SECRET")
+bp = Blueprint('main', __name__, cli_group=None)
 
-db = SQLAlchemy(app)
+db = SQLAlchemy()
 
 login_manager = LoginManager()
-login_manager.init_app(app)
-login_manager.login_view = 'host_login'
-
-oauth = OAuth(app)
-google = oauth.register(
-    name='google',
-    server_metadata_url='https://accounts.google.com/.well-known/openid-configuration',
-    client_kwargs={
-        'scope': 'openid email profile https://www.googleapis.com/auth/drive.file'
-    },
-    authorize_params={
-        'access_type': 'offline',
-        'prompt': 'consent'
-    }
-)
+login_manager.login_view = 'main.host_login'
+
+
+def get_google_oauth():
+    oauth = current_app.extensions.get('pretitudes_oauth')
+    if oauth is None:
+        from authlib.integrations.flask_client import OAuth
+
+        oauth = OAuth(current_app)
+        oauth.register(
+            name='google',
+            server_metadata_url='https://accounts.google.com/.well-known/openid-configuration',
+            client_kwargs={
+                'scope': 'openid email profile https://www.googleapis.com/auth/drive.file'
+            },
+            authorize_params={
+                'access_type': 'offline',
+                'prompt': 'consent'
+            }
+        )
+        current_app.extensions['pretitudes_oauth'] = oauth
+    return oauth.google
+
+
+_pil_ready = False
+_http = None
+
+
+def load_pil():
+    global _pil_ready
+    from PIL import Image, ImageOps
+    if not _pil_ready:
+        import pillow_heif
+        pillow_heif.register_heif_opener()
+        _pil_ready = True
+    return Image, ImageOps
+
+
+def get_http_session():
+    """Sessão HTTP do processo para o Drive, reaproveitando conexões keep-alive."""
+    global _http
+    if _http is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        http = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=current_app.config['DRIVE_HTTP_POOL_SIZE'])
+        http.mount('https://', adapter)
+        http.mount('http://', adapter)
+        _http = http
+    return _http
+
+
+def preload_heavy_modules():
+    """Importa as dependências pesadas antes do fork (gunicorn preload_app)."""
+    load_pil()
+    import requests  # noqa: F401
+    import google.oauth2.credentials  # noqa: F401
+    import google.auth.transport.requests  # noqa: F401
+    import googleapiclient.discovery  # noqa: F401
+    import googleapiclient.http  # noqa: F401
+    import authlib.integrations.flask_client  # noqa: F401
+
 
 class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -94,6 +122,8 @@ class StorageAccount(db.Model):
     google_id = db.Column(db.String(100), unique=True, nullable=False)
     tokens = db.Column(db.Text, nullable=False)
     is_active = db.Column(db.Boolean, default=True)
+    reclaimed_bytes = db.Column(db.BigInteger, default=0)
+    last_gc_at = db.Column(db.DateTime, nullable=True)
 
 
 class Room(db.Model):
@@ -124,6 +154,10 @@ class Post(db.Model):
     drive_file_id = db.Column(db.String(100), nullable=True)
     storage_account_id = db.Column(db.Integer, db.ForeignKey('storage_account.id'), nullable=True)
     storage_account = db.relationship('StorageAccount')
+    image_width = db.Column(db.Integer, nullable=True)
+    image_height = db.Column(db.Integer, nullable=True)
+    placeholder = db.Column(db.Text, nullable=True)
+    likes_count = db.Column(db.Integer, default=0, nullable=False)
     caption = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -131,7 +165,26 @@ class Post(db.Model):
     comments = db.relationship('PostComment', backref='post', lazy='select', cascade="all, delete-orphan", order_by='PostComment.created_at.asc()')
 
 
+class DriveFile(db.Model):
+    # Índice hash do upload original -> arquivo no Drive, compartilhado por posts idênticos.
+    id = db.Column(db.Integer, primary_key=True)
+    content_hash = db.Column(db.String(64), unique=True, nullable=False)
+    drive_file_id = db.Column(db.String(100), nullable=False, index=True)
+    storage_account_id = db.Column(db.Integer, db.ForeignKey('storage_account.id'), nullable=True)
+    ref_count = db.Column(db.Integer, default=0, nullable=False)
+    image_width = db.Column(db.Integer, nullable=True)
+    image_height = db.Column(db.Integer, nullable=True)
+    placeholder = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
 class PostLike(db.Model):
+    # Uma curtida por usuário ou convidado: toggle_like depende destas constraints.
+    __table_args__ = (
+        db.UniqueConstraint('post_id', 'user_id', name='uq_post_like_user'),
+        db.UniqueConstraint('post_id', 'guest_id', name='uq_post_like_guest'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     post_id = db.Column(db.Integer, db.ForeignKey('post.id'), nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
@@ -140,7 +193,7 @@ class PostLike(db.Model):
 
 class PostComment(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    post_id = db.Column(db.Integer, db.ForeignKey('post.id', ondelete='CASCADE'), nullable=False)
+    post_id = db.Column(db.Integer, db.ForeignKey('post.id', ondelete='CASCADE'), nullable=False, index=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
     user = db.relationship('User', backref=db.backref('comments', lazy=True))
     guest_name = db.Column(db.String(100), nullable=True)
@@ -149,6 +202,68 @@ class PostComment(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
 
+@event.listens_for(Engine, 'before_cursor_execute')
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['query_started'].pop()
+    metrics.sql_queries.inc()
+
+    if not has_request_context() or 'sql_stats' not in g:
+        return
+    stats = g.sql_stats
+    stats['count'] += 1
+    stats['seconds'] += elapsed
+    if current_app.config['SLOW_REQUEST_MS']:
+        count, total = stats['statements'].get(statement, (0, 0.0))
+        stats['statements'][statement] = (count + 1, total + elapsed)
+
+
+@bp.before_app_request
+def start_request_metrics():
+    g.request_started = time.perf_counter()
+    g.sql_stats = {'count': 0, 'seconds': 0.0, 'statements': {}}
+
+
+@bp.after_app_request
+def record_request_metrics(response):
+    started = g.get('request_started')
+    if started is None:
+        return response
+
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    method = request.method
+    path = request.full_path
+    stats = g.sql_stats
+    slow_ms = current_app.config['SLOW_REQUEST_MS']
+    logger = current_app.logger
+
+    # call_on_close roda depois do último byte (e fora do contexto da app),
+    # então inclui respostas em streaming (cdn_proxy).
+    def finish():
+        elapsed = time.perf_counter() - started
+        metrics.request_duration.observe(elapsed, route=route, method=method, status=response.status_code)
+        metrics.request_queries.observe(stats['count'], route=route)
+        metrics.request_sql_duration.observe(stats['seconds'], route=route)
+
+        if slow_ms and elapsed * 1000 >= slow_ms:
+            top = sorted(stats['statements'].items(), key=lambda item: item[1][1], reverse=True)[:5]
+            breakdown = '\n'.join(
+                f"    {count}x {total * 1000:.1f}ms  {' '.join(statement.split())[:200]}"
+                for statement, (count, total) in top
+            )
+            logger.warning(
+                f"Requisição lenta: {method} {path} {response.status_code} em {elapsed * 1000:.0f}ms, "
+                f"{stats['count']} consultas SQL ({stats['seconds'] * 1000:.0f}ms)\n{breakdown}"
+            )
+
+    response.call_on_close(finish)
+    return response
+
+
 @login_manager.user_loader
 def load_user(user_id):
     return db.session.get(User, int(user_id))
@@ -158,26 +273,85 @@ def get_google_credentials(account_obj):
     if not account_obj or not account_obj.tokens:
         return None
 
+    from google.oauth2.credentials import Credentials
+
     token_data = json.loads(account_obj.tokens)
     return Credentials(
         token=token_data['access_token'],
         refresh_token=token_data.get('refresh_token'),
-        token_uri='https://oauth2.googleapis.com/token',
-        client_id=app.config['GOOGLE_CLIENT_ID'],
-        client_secret=app.config['GOOGLE_CLIENT_SECRET'],
+        token_uri=current_app.config['GOOGLE_TOKEN_URI'],
+        client_id=current_app.config['GOOGLE_CLIENT_ID'],
+        client_secret=current_app.config['GOOGLE_CLIENT_SECRET'],
         scopes=['https://www.googleapis.com/auth/drive.file']
     )
 
 
 def get_drive_service(account_obj):
+    from googleapiclient.discovery import build
+
     creds = get_google_credentials(account_obj)
-    return build('drive', 'v3', credentials=creds)
+    return build(
+        'drive', 'v3',
+        credentials=creds,
+        client_options={'api_endpoint': f"{current_app.config['DRIVE_API_URL']}/drive/v3/"}
+    )
+
 
+def hash_upload(file_storage):
+    digest = hashlib.sha256()
+    file_storage.seek(0)
+    for chunk in iter(lambda: file_storage.read(64 * 1024), b''):
+        digest.update(chunk)
+    file_storage.seek(0)
+    return digest.hexdigest()
+
+
+def acquire_drive_file(content_hash):
+    """Soma uma referência ao arquivo já enviado com este hash.
+
+    UPDATE único em vez de ler e gravar: se um delete_post concorrente acabou
+    de apagar a linha, nada é atualizado e volta None (o chamador envia de novo).
+    """
+    return db.session.execute(
+        db.update(DriveFile)
+        .where(DriveFile.content_hash == content_hash)
+        .values(ref_count=DriveFile.ref_count + 1)
+        .returning(DriveFile.drive_file_id, DriveFile.storage_account_id,
+                   DriveFile.image_width, DriveFile.image_height, DriveFile.placeholder)
+    ).first()
+
+
+def release_drive_file(drive_file_id):
+    """Solta uma referência ao arquivo; sem referências o coletor do Drive pode apagá-lo."""
+    if not drive_file_id:
+        return
+    remaining = db.session.execute(
+        db.update(DriveFile)
+        .where(DriveFile.drive_file_id == drive_file_id)
+        .values(ref_count=DriveFile.ref_count - 1)
+        .returning(DriveFile.ref_count)
+    ).scalar()
+    if remaining is not None and remaining <= 0:
+        db.session.execute(
+            db.delete(DriveFile).where(DriveFile.drive_file_id == drive_file_id, DriveFile.ref_count <= 0)
+        )
+
+
+def compress_image_if_needed(file_storage, placeholder=True):
+    # placeholder=False nos avatares, que não usam a miniatura.
+    with metrics.image_duration.time():
+        result = _compress_image(file_storage, placeholder)
+    metrics.image_output_bytes.observe(result[0].getbuffer().nbytes)
+    return result
+
+
+def _compress_image(file_storage, placeholder=True):
+    Image, ImageOps = load_pil()
 
-def compress_image_if_needed(file_storage):
     file_storage.seek(0, os.SEEK_END)
     size = file_storage.tell()
     file_storage.seek(0)
+    metrics.image_input_bytes.observe(size)
 
     # Note: Even if size is small, we should process it to fix Exif orientation
     # and convert HEIF to JPEG for cross-browser compatibility.
@@ -196,62 +370,246 @@ def compress_image_if_needed(file_storage):
     img.save(output, format="JPEG", quality=70, optimize=True)
     output.seek(0)
 
-    return output, 'image/jpeg'
+    return output, 'image/jpeg', {
+        'width': img.size[0],
+        'height': img.size[1],
+        'placeholder': make_placeholder(img) if placeholder else None,
+    }
+
+
+def make_placeholder(img):
+    # LQIP: miniatura inline exibida como fundo do <img> até a foto chegar.
+    # PNG nesse tamanho sai bem menor que JPEG (sem tabelas de quantização).
+    # convert() também cobre CMYK e outros modos que o PNG não grava.
+    thumb = img.convert('RGB')
+    thumb.thumbnail((12, 12))
+    output = io.BytesIO()
+    thumb.save(output, format="PNG", optimize=True)
+    return "data:image/png;base64," + base64.b64encode(output.getvalue()).decode('ascii')
+
+
+def get_drive_folder_id(service, create=True):
+    query = "mimeType='application/vnd.google-apps.folder' and name='pretitudes' and trashed=false"
+    with metrics.track_drive('files.list'):
+        results = service.files().list(q=query, spaces='drive', fields='files(id, name)').execute()
+    items = results.get('files', [])
+
+    if items:
+        return items[0]['id']
+    if not create:
+        return None
+
+    file_metadata = {'name': 'pretitudes', 'mimeType': 'application/vnd.google-apps.folder'}
+    with metrics.track_drive('files.create'):
+        folder = service.files().create(body=file_metadata, fields='id').execute()
+    return folder.get('id')
 
 
 def upload_to_drive(file_obj, filename, mime_type):
     account = StorageAccount.query.filter_by(is_active=True).first()
     if not account:
-        if not app.config.get('IS_PROD'):
+        if not current_app.config.get('IS_PROD'):
             mock_id = f"mock_{uuid.uuid4().hex}"
             return mock_id, f"/cdn/{mock_id}", None
         raise Exception("Nenhuma conta de armazenamento configurada.")
 
-    service = get_drive_service(account)
-
-    query = "mimeType='application/vnd.google-apps.folder' and name='pretitudes' and trashed=false"
-    results = service.files().list(q=query, spaces='drive', fields='files(id, name)').execute()
-    items = results.get('files', [])
+    from googleapiclient.http import MediaIoBaseUpload
 
-    if not items:
-        file_metadata = {'name': 'pretitudes', 'mimeType': 'application/vnd.google-apps.folder'}
-        folder = service.files().create(body=file_metadata, fields='id').execute()
-        folder_id = folder.get('id')
-    else:
-        folder_id = items[0]['id']
+    service = get_drive_service(account)
+    folder_id = get_drive_folder_id(service)
 
     file_metadata = {'name': filename, 'parents': [folder_id]}
     media = MediaIoBaseUpload(file_obj, mimetype=mime_type, resumable=True)
-    file = service.files().create(
-        body=file_metadata,
-        media_body=media,
-        fields='id'
-    ).execute()
+    with metrics.track_drive('files.create'):
+        file = service.files().create(
+            body=file_metadata,
+            media_body=media,
+            fields='id'
+        ).execute()
 
     file_id = file.get('id')
 
     try:
         permission = {'type': 'anyone', 'role': 'reader', 'allowFileDiscovery': False}
-        service.permissions().create(fileId=file_id, body=permission).execute()
+        with metrics.track_drive('permissions.create'):
+            service.permissions().create(fileId=file_id, body=permission).execute()
     except Exception:
         pass
 
     return file_id, f"/cdn/{file_id}", account.id
 
 
+def cdn_file_id(url):
+    # Avatares guardam a URL do proxy (/cdn/<file_id>), posts guardam o id direto.
+    if not url or '/cdn/' not in url:
+        return None
+    return url.rsplit('/cdn/', 1)[1].split('?', 1)[0] or None
+
+
+def referenced_drive_file_ids():
+    file_ids = {row[0] for row in db.session.query(Post.drive_file_id).filter(Post.drive_file_id.isnot(None))}
+    file_ids.update(row[0] for row in db.session.query(DriveFile.drive_file_id).filter(DriveFile.ref_count > 0))
+    for model in (User, RoomMember):
+        for (avatar,) in db.session.query(model.avatar).filter(model.avatar.isnot(None)):
+            file_id = cdn_file_id(avatar)
+            if file_id:
+                file_ids.add(file_id)
+    return file_ids
+
+
+def list_drive_folder_files(service, folder_id):
+    query = f"'{folder_id}' in parents and trashed=false"
+    page_token = None
+    while True:
+        with metrics.track_drive('files.list'):
+            results = service.files().list(
+                q=query,
+                spaces='drive',
+                fields='nextPageToken, files(id, size, createdTime)',
+                pageSize=1000,
+                pageToken=page_token
+            ).execute()
+        yield from results.get('files', [])
+        page_token = results.get('nextPageToken')
+        if not page_token:
+            break
+
+
+def delete_drive_files_batched(service, files):
+    """Apaga os arquivos em requisições batch e devolve os bytes liberados."""
+    from googleapiclient.http import BatchHttpRequest
+
+    batch_size = max(1, min(current_app.config['DRIVE_GC_BATCH_SIZE'], 100))
+    pause = current_app.config['DRIVE_GC_BATCH_PAUSE']
+    sizes = {f['id']: int(f.get('size') or 0) for f in files}
+    logger = current_app.logger
+    reclaimed = 0
+
+    def on_delete(request_id, response, exception):
+        nonlocal reclaimed
+        status = getattr(getattr(exception, 'resp', None), 'status', None)
+        if exception is None:
+            reclaimed += sizes.get(request_id, 0)
+        elif status != 404:
+            # 404: o arquivo já tinha sido apagado por outro caminho; não libera nada agora.
+            metrics.drive_errors.inc(operation='files.delete')
+            logger.warning(f"Erro ao apagar {request_id} no Drive: {exception}")
+
+    file_ids = list(sizes)
+    for start in range(0, len(file_ids), batch_size):
+        if start:
+            time.sleep(pause)
+        batch = BatchHttpRequest(callback=on_delete, batch_uri=f"{current_app.config['DRIVE_API_URL']}/batch/drive/v3")
+        for file_id in file_ids[start:start + batch_size]:
+            batch.add(service.files().delete(fileId=file_id), request_id=file_id)
+        with metrics.track_drive('batch'):
+            batch.execute()
+
+    return reclaimed
+
+
+# Chave do advisory lock do coletor no PostgreSQL (arbitrária, fixa).
+DRIVE_GC_LOCK_KEY = 740_251_001
+_drive_gc_local_lock = threading.Lock()
+
+
+@contextmanager
+def drive_gc_lock():
+    """Garante uma varredura por vez; devolve False se outra já está rodando.
+
+    No PostgreSQL usa um advisory lock de sessão numa conexão dedicada, que vale
+    entre processos e máquinas e cai sozinho se o processo morrer. Nos outros
+    bancos (SQLite local) vale só dentro do processo.
+    """
+    if not _drive_gc_local_lock.acquire(blocking=False):
+        yield False
+        return
+    try:
+        if db.engine.dialect.name != 'postgresql':
+            yield True
+            return
+        with db.engine.connect() as conn:
+            acquired = conn.execute(db.select(db.func.pg_try_advisory_lock(DRIVE_GC_LOCK_KEY))).scalar()
+            conn.commit()
+            try:
+                yield acquired
+            finally:
+                if acquired:
+                    conn.execute(db.select(db.func.pg_advisory_unlock(DRIVE_GC_LOCK_KEY)))
+                    conn.commit()
+    finally:
+        _drive_gc_local_lock.release()
+
+
+def collect_drive_garbage():
+    """Apaga da pasta 'pretitudes' os arquivos que nenhum post ou avatar referencia.
+
+    Retorna {email da conta: bytes liberados nesta varredura}, ou None se outra
+    varredura estava em andamento e esta foi pulada.
+    """
+    with drive_gc_lock() as acquired:
+        if not acquired:
+            return None
+        return _collect_drive_garbage()
+
+
+def _collect_drive_garbage():
+    referenced = referenced_drive_file_ids()
+    cutoff = datetime.utcnow() - timedelta(seconds=current_app.config['DRIVE_GC_MIN_AGE'])
+    report = {}
+
+    for account in StorageAccount.query.filter_by(is_active=True).all():
+        try:
+            service = get_drive_service(account)
+            folder_id = get_drive_folder_id(service, create=False)
+            if not folder_id:
+                continue
+
+            orphans = []
+            for f in list_drive_folder_files(service, folder_id):
+                if f['id'] in referenced:
+                    continue
+                # Uploads recentes podem ainda não ter o Post gravado.
+                created = datetime.fromisoformat(f['createdTime'].replace('Z', '+00:00')).replace(tzinfo=None)
+                if created > cutoff:
+                    continue
+                orphans.append(f)
+
+            reclaimed = delete_drive_files_batched(service, orphans) if orphans else 0
+        except Exception:
+            current_app.logger.exception(f"Erro no coletor do Drive para {account.email}")
+            continue
+
+        account.reclaimed_bytes = (account.reclaimed_bytes or 0) + reclaimed
+        account.last_gc_at = datetime.utcnow()
+        db.session.commit()
+        report[account.email] = reclaimed
+
+    return report
+
+
+def insert_ignoring_conflicts(model):
+    # INSERT ... ON CONFLICT DO NOTHING (PostgreSQL em produção, SQLite local).
+    if db.session.get_bind().dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(model).on_conflict_do_nothing()
+
+
 def generate_room_code():
     return ''.join(secrets.choice(string.ascii_uppercase + string.digits) for _ in range(6))
 
 
-@app.route('/')
+@bp.route('/')
 def index():
     return render_template('enter_code.html')
 
 
-@app.route('/register', methods=['GET', 'POST'])
+@bp.route('/register', methods=['GET', 'POST'])
 def register():
     if current_user.is_authenticated:
-        return redirect(url_for('profile'))
+        return redirect(url_for('main.profile'))
 
     if request.method == 'POST':
         username = request.form.get('username', '').strip()
@@ -273,12 +631,12 @@ def register():
         db.session.commit()
 
         login_user(new_user)
-        return redirect(url_for('setup_profile'))
+        return redirect(url_for('main.setup_profile'))
 
     return render_template('register.html')
 
 
-@app.route('/setup_profile', methods=['GET', 'POST'])
+@bp.route('/setup_profile', methods=['GET', 'POST'])
 @login_required
 def setup_profile():
     if request.method == 'POST':
@@ -291,27 +649,27 @@ def setup_profile():
         current_user.name = name
 
         if file:
-            processed_file, mime_type = compress_image_if_needed(file)
+            processed_file, mime_type, _ = compress_image_if_needed(file, placeholder=False)
             filename = secure_filename(f"avatar_{current_user.id}_{uuid.uuid4().hex[:8]}")
             if mime_type == 'image/jpeg' and not filename.lower().endswith(('.jpg', '.jpeg')):
                 filename = f"{filename}.jpg"
 
             try:
                 file_id, image_url, _ = upload_to_drive(processed_file, filename, mime_type)
-                current_user.avatar = url_for('cdn_proxy', file_id=file_id)
+                current_user.avatar = url_for('main.cdn_proxy', file_id=file_id)
             except Exception as e:
                 return render_template('setup_profile.html', error=str(e))
 
         db.session.commit()
-        return redirect(url_for('profile'))
+        return redirect(url_for('main.profile'))
 
     return render_template('setup_profile.html')
 
 
-@app.route('/host', methods=['GET', 'POST'])
+@bp.route('/host', methods=['GET', 'POST'])
 def host_login():
     if current_user.is_authenticated:
-        return redirect(url_for('profile'))
+        return redirect(url_for('main.profile'))
 
     if request.method == 'POST':
         username = request.form.get('username')
@@ -320,44 +678,57 @@ def host_login():
         user = User.query.filter_by(username=username).first()
         if user and user.check_password(password):
             login_user(user, remember=True)
-            return redirect(url_for('profile'))
+            return redirect(url_for('main.profile'))
 
         return render_template('login_simple.html', error="Credenciais inválidas")
 
     return render_template('login_simple.html')
 
 
-@app.route('/logout')
+@bp.route('/logout')
 @login_required
 def logout():
     logout_user()
-    return redirect(url_for('index'))
+    return redirect(url_for('main.index'))
 
 
-@app.route('/admin/storage')
+@bp.route('/admin/storage')
 @login_required
 def admin_storage():
     if not current_user.is_admin:
-         return redirect(url_for('profile'))
+         return redirect(url_for('main.profile'))
     accounts = StorageAccount.query.all()
     return render_template('admin_storage.html', accounts=accounts)
 
 
-@app.route('/admin/connect_google')
+@bp.route('/admin/metrics')
+def admin_metrics():
+    token = current_app.config.get('METRICS_TOKEN')
+    auth = request.headers.get('Authorization', '')
+    # Em bytes: compare_digest recusa str com caracteres fora do ASCII.
+    token_ok = bool(token) and secrets.compare_digest(auth.encode(), f"Bearer {token}".encode())
+
+    if not token_ok and not (current_user.is_authenticated and current_user.is_admin):
+        return "Não autorizado", 403
+    return Response(metrics.registry.render(), mimetype='text/plain; version=0.0.4')
+
+
+@bp.route('/admin/connect_google')
 @login_required
 def admin_connect_google():
     if not current_user.is_admin:
-         return redirect(url_for('profile'))
-    redirect_uri = url_for('admin_auth_callback', _external=True)
-    return google.authorize_redirect(redirect_uri)
+         return redirect(url_for('main.profile'))
+    redirect_uri = url_for('main.admin_auth_callback', _external=True)
+    return get_google_oauth().authorize_redirect(redirect_uri)
 
 
-@app.route('/admin/callback')
+@bp.route('/admin/callback')
 @login_required
 def admin_auth_callback():
     if not current_user.is_admin:
-        return redirect(url_for('profile'))
+        return redirect(url_for('main.profile'))
 
+    google = get_google_oauth()
     token = google.authorize_access_token()
 
     if 'refresh_token' not in token:
@@ -427,10 +798,10 @@ def admin_auth_callback():
     account.is_active = True
     db.session.commit()
 
-    return redirect(url_for('admin_storage'))
+    return redirect(url_for('main.admin_storage'))
 
 
-@app.route('/join_code', methods=['POST'])
+@bp.route('/join_code', methods=['POST'])
 def join_by_code():
     code = request.form.get('code', '').upper().strip()
     room = Room.query.filter_by(code=code).first()
@@ -438,10 +809,10 @@ def join_by_code():
     if not room:
         return render_template('enter_code.html', error="Sala não encontrada")
 
-    return redirect(url_for('join_room', room_hash=room.hash_id))
+    return redirect(url_for('main.join_room', room_hash=room.hash_id))
 
 
-@app.route('/room/<room_hash>/auth', methods=['GET', 'POST'])
+@bp.route('/room/<room_hash>/auth', methods=['GET', 'POST'])
 def guest_login(room_hash):
     room = db.session.get(Room, room_hash)
     if not room:
@@ -466,31 +837,31 @@ def guest_login(room_hash):
             db.session.add(member)
 
         if file:
-            processed_file, mime_type = compress_image_if_needed(file)
+            processed_file, mime_type, _ = compress_image_if_needed(file, placeholder=False)
             filename = secure_filename(f"guest_{uuid.uuid4().hex[:8]}")
             if mime_type == 'image/jpeg' and not filename.lower().endswith(('.jpg', '.jpeg')):
                 filename = f"{filename}.jpg"
 
             try:
                 file_id, image_url, _ = upload_to_drive(processed_file, filename, mime_type)
-                member.avatar = url_for('cdn_proxy', file_id=file_id)
+                member.avatar = url_for('main.cdn_proxy', file_id=file_id)
             except Exception as e:
                 return render_template('guest_login.html', room=room, error=str(e))
 
         db.session.commit()
 
-        return redirect(url_for('join_room', room_hash=room_hash))
+        return redirect(url_for('main.join_room', room_hash=room_hash))
 
     return render_template('guest_login.html', room=room)
 
 
-@app.route('/profile')
+@bp.route('/profile')
 @login_required
 def profile():
     return render_template('profile.html', user=current_user)
 
 
-@app.route('/join/<room_hash>')
+@bp.route('/join/<room_hash>')
 def join_room(room_hash):
     room = db.session.get(Room, room_hash)
     if not room:
@@ -505,7 +876,7 @@ def join_room(room_hash):
             db.session.commit()
     else:
         if not session.get(f'guest_room_{room_hash}'):
-            return redirect(url_for('guest_login', room_hash=room_hash))
+            return redirect(url_for('main.guest_login', room_hash=room_hash))
         is_guest = True
 
     posts = Post.query.filter_by(room_hash=room_hash).order_by(Post.created_at.desc()).all()
@@ -530,7 +901,7 @@ def join_room(room_hash):
     return render_template('feed.html', room=room, posts=posts, user=current_user, is_guest=is_guest, guest_avatars=guest_avatars)
 
 
-@app.route('/api/profile/update', methods=['POST'])
+@bp.route('/api/profile/update', methods=['POST'])
 @login_required
 def update_profile():
     name = request.form.get('name')
@@ -540,12 +911,12 @@ def update_profile():
         current_user.name = name.strip()
 
     if file:
-        processed_file, mime_type = compress_image_if_needed(file)
+        processed_file, mime_type, _ = compress_image_if_needed(file, placeholder=False)
         filename = secure_filename(f"avatar_{current_user.id}_{uuid.uuid4().hex[:8]}")
 
         try:
              file_id, image_url, _ = upload_to_drive(processed_file, filename, mime_type)
-             current_user.avatar = url_for('cdn_proxy', file_id=file_id)
+             current_user.avatar = url_for('main.cdn_proxy', file_id=file_id)
         except Exception as e:
             return jsonify({'error': str(e)}), 500
 
@@ -553,7 +924,7 @@ def update_profile():
     return jsonify({'success': True})
 
 
-@app.route('/api/create_room', methods=['POST'])
+@bp.route('/api/create_room', methods=['POST'])
 @login_required
 def create_room():
     data = request.json
@@ -572,10 +943,10 @@ def create_room():
     )
     db.session.add(new_room)
     db.session.commit()
-    return jsonify({'redirect_url': url_for('join_room', room_hash=room_hash, _external=True)})
+    return jsonify({'redirect_url': url_for('main.join_room', room_hash=room_hash, _external=True)})
 
 
-@app.route('/api/post/<room_hash>', methods=['POST'])
+@bp.route('/api/post/<room_hash>', methods=['POST'])
 def add_post(room_hash):
     if not current_user.is_authenticated and not session.get(f'guest_room_{room_hash}'):
         return jsonify({'error': 'Não autorizado'}), 403
@@ -586,16 +957,49 @@ def add_post(room_hash):
     if not file:
         return jsonify({'error': 'Dados incompletos'}), 400
 
-    processed_file, mime_type = compress_image_if_needed(file)
+    content_hash = hash_upload(file)
+    uploaded = None
 
-    filename = secure_filename(f"{uuid.uuid4().hex[:8]}_{file.filename}")
-    if mime_type == 'image/jpeg' and not filename.lower().endswith(('.jpg', '.jpeg')):
-        filename = f"{filename}.jpg"
+    # Reaproveita o arquivo do mesmo hash; se não houver, envia e registra. Duas
+    # corridas possíveis: um upload idêntico registra antes (IntegrityError, usa o
+    # dele e o nosso vira órfão para o coletor) ou o registro some por um
+    # delete_post concorrente (tenta de novo, registrando o nosso).
+    for _ in range(3):
+        drive_file = acquire_drive_file(content_hash)
+        if drive_file:
+            break
 
-    try:
-        file_id, image_url, storage_account_id = upload_to_drive(processed_file, filename, mime_type)
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        if uploaded is None:
+            processed_file, mime_type, image_info = compress_image_if_needed(file)
+
+            filename = secure_filename(f"{uuid.uuid4().hex[:8]}_{file.filename}")
+            if mime_type == 'image/jpeg' and not filename.lower().endswith(('.jpg', '.jpeg')):
+                filename = f"{filename}.jpg"
+
+            try:
+                file_id, image_url, storage_account_id = upload_to_drive(processed_file, filename, mime_type)
+            except Exception as e:
+                return jsonify({'error': str(e)}), 500
+            uploaded = (file_id, storage_account_id, image_info)
+
+        file_id, storage_account_id, image_info = uploaded
+        drive_file = DriveFile(
+            content_hash=content_hash,
+            drive_file_id=file_id,
+            storage_account_id=storage_account_id,
+            ref_count=1,
+            image_width=image_info['width'],
+            image_height=image_info['height'],
+            placeholder=image_info['placeholder']
+        )
+        db.session.add(drive_file)
+        try:
+            db.session.flush()
+            break
+        except IntegrityError:
+            db.session.rollback()
+    else:
+        return jsonify({'error': 'Não foi possível registrar o arquivo, tente novamente'}), 503
 
     author_id = current_user.id if current_user.is_authenticated else None
     guest_name = None
@@ -607,9 +1011,12 @@ def add_post(room_hash):
         room_hash=room_hash,
         author_id=author_id,
         guest_name=guest_name,
-        image_url=image_url,
-        drive_file_id=file_id,
-        storage_account_id=storage_account_id,
+        image_url=f"/cdn/{drive_file.drive_file_id}",
+        drive_file_id=drive_file.drive_file_id,
+        storage_account_id=drive_file.storage_account_id,
+        image_width=drive_file.image_width,
+        image_height=drive_file.image_height,
+        placeholder=drive_file.placeholder,
         caption=caption
     )
     db.session.add(new_post)
@@ -617,7 +1024,7 @@ def add_post(room_hash):
     return jsonify({'success': True})
 
 
-@app.route('/cdn/<file_id>')
+@bp.route('/cdn/<file_id>')
 def cdn_proxy(file_id):
     if not file_id:
         return "Arquivo não encontrado", 404
@@ -651,8 +1058,11 @@ def cdn_proxy(file_id):
         return Response("Erro nas credenciais de acesso", status=500)
 
     def refresh_and_update(creds, account):
+        from google.auth.transport.requests import Request as GoogleRequest
+
         try:
-            creds.refresh(GoogleRequest())
+            with metrics.track_drive('token.refresh'):
+                creds.refresh(GoogleRequest())
             token_data = json.loads(account.tokens)
             token_data['access_token'] = creds.token
             if creds.expiry:
@@ -668,39 +1078,51 @@ def cdn_proxy(file_id):
         if not refresh_and_update(creds, account):
             return Response("Token expirado e falha na renovação", status=403)
 
-    api_url = f"https://www.googleapis.com/drive/v3/files/{file_id}?alt=media"
+    api_url = f"{current_app.config['DRIVE_API_URL']}/drive/v3/files/{file_id}?alt=media"
+    timeout = (5, current_app.config['DRIVE_MEDIA_TIMEOUT'])
+
+    def fetch_media():
+        headers = {'Authorization': f'Bearer {creds.token}'}
+        with metrics.track_drive('media.get'):
+            req = get_http_session().get(api_url, headers=headers, stream=True, timeout=timeout)
+        if req.status_code != 200:
+            metrics.drive_errors.inc(operation='media.get')
+        return req
 
-    headers = {'Authorization': f'Bearer {creds.token}'}
-    req = requests.get(api_url, headers=headers, stream=True)
+    req = fetch_media()
 
     if req.status_code == 401 and creds.refresh_token:
         print(f"Token inválido (401) para {file_id}. Tentando renovar...")
+        req.close()
         if refresh_and_update(creds, account):
-            headers = {'Authorization': f'Bearer {creds.token}'}
-            req = requests.get(api_url, headers=headers, stream=True)
+            req = fetch_media()
         else:
             return Response("Sessão expirada. Faça login novamente no painel admin.", status=403)
 
     if req.status_code != 200:
+        req.close()
         return Response(f"Erro ao carregar imagem: {req.status_code}", status=req.status_code)
 
     forward_headers = {
         'Content-Type': req.headers.get('Content-Type'),
         'Cache-Control': 'public, max-age=31536000'
     }
+    if req.headers.get('Content-Length'):
+        forward_headers['Content-Length'] = req.headers['Content-Length']
 
-    return Response(
-        stream_with_context(req.iter_content(chunk_size=4096)),
-        headers=forward_headers,
-        status=200
-    )
+    # Sem stream_with_context: o contexto da requisição (e a conexão do banco)
+    # é liberado antes do streaming, então clientes lentos não seguram o pool.
+    def generate():
+        try:
+            yield from req.iter_content(chunk_size=64 * 1024)
+        finally:
+            req.close()
 
+    return Response(generate(), headers=forward_headers, status=200)
 
-@app.route('/api/like/<int:post_id>', methods=['POST'])
-def toggle_like(post_id):
-    post = db.session.get(Post, post_id)
-    if not post: return jsonify({'error': 'Not found'}), 404
 
+@bp.route('/api/like/<int:post_id>', methods=['POST'])
+def toggle_like(post_id):
     user_id = current_user.id if current_user.is_authenticated else None
     guest_id = session.get('guest_id')
 
@@ -709,26 +1131,45 @@ def toggle_like(post_id):
         guest_id = str(uuid.uuid4())
         session['guest_id'] = guest_id
 
-    query = PostLike.query.filter_by(post_id=post_id)
-    if user_id:
-        existing = query.filter_by(user_id=user_id).first()
-    else:
-        existing = query.filter_by(guest_id=guest_id).first()
+    # Toggle sem ler antes: apaga a curtida se existir, senão insere ignorando
+    # conflito (toques simultâneos não duplicam), e ajusta o contador do post
+    # na mesma transação, que devolve o total novo.
+    owner = PostLike.user_id == user_id if user_id else PostLike.guest_id == guest_id
+    removed = db.session.execute(
+        db.delete(PostLike).where(PostLike.post_id == post_id, owner).returning(PostLike.id)
+    ).first()
 
-    liked = False
-    if existing:
-        db.session.delete(existing)
+    if removed:
+        liked, delta = False, -1
     else:
-        new_like = PostLike(post_id=post_id, user_id=user_id, guest_id=guest_id)
-        db.session.add(new_like)
-        liked = True
+        try:
+            added = db.session.execute(
+                insert_ignoring_conflicts(PostLike)
+                .values(post_id=post_id, user_id=user_id, guest_id=None if user_id else guest_id)
+                .returning(PostLike.id)
+            ).first()
+        except IntegrityError:
+            # Post inexistente: no PostgreSQL o ON CONFLICT não cobre a chave estrangeira.
+            db.session.rollback()
+            return jsonify({'error': 'Not found'}), 404
+        liked, delta = True, 1 if added else 0
+
+    count = db.session.execute(
+        db.update(Post)
+        .where(Post.id == post_id)
+        .values(likes_count=Post.likes_count + delta, updated_at=datetime.utcnow())
+        .returning(Post.likes_count)
+    ).scalar()
+
+    if count is None:
+        db.session.rollback()
+        return jsonify({'error': 'Not found'}), 404
 
-    post.updated_at = datetime.utcnow()
     db.session.commit()
-    return jsonify({'liked': liked, 'count': post.likes.count()})
+    return jsonify({'liked': liked, 'count': count})
 
 
-@app.route('/api/updates/<room_hash>')
+@bp.route('/api/updates/<room_hash>')
 def check_updates(room_hash):
     if not current_user.is_authenticated and not session.get(f'guest_room_{room_hash}'):
         return jsonify({'error': 'Não autorizado'}), 403
@@ -742,7 +1183,14 @@ def check_updates(room_hash):
     if since_time_str:
         try:
             since_time = datetime.fromisoformat(since_time_str.replace('Z', '+00:00'))
-            query = query.filter(db.or_(Post.created_at > since_time, Post.updated_at > since_time))
+            if since_time.tzinfo:
+                # As colunas guardam UTC sem fuso.
+                since_time = since_time.astimezone(timezone.utc).replace(tzinfo=None)
+            query = query.filter(db.or_(
+                Post.created_at > since_time,
+                Post.updated_at > since_time,
+                Post.comments.any(PostComment.created_at > since_time)
+            ))
         except ValueError:
             pass
 
@@ -775,7 +1223,13 @@ def check_updates(room_hash):
         elif guest_id:
             liked_by_me = post.likes.filter_by(guest_id=guest_id).first() is not None
 
-        img_url = url_for('cdn_proxy', file_id=post.drive_file_id, _external=True)
+        img_url = url_for('main.cdn_proxy', file_id=post.drive_file_id, _external=True)
+
+        # Comentários não mexem no post: a última atividade inclui o mais novo
+        # deles, senão o cliente nunca passa o since_time além do comentário.
+        last_activity = max(
+            [post.updated_at or post.created_at] + [c.created_at for c in post.comments if c.created_at]
+        )
 
         comments_data = []
         for c in post.comments:
@@ -795,19 +1249,22 @@ def check_updates(room_hash):
             'author_avatar': author_avatar,
             'author_initial': author_initial,
             'image_url': img_url,
+            'width': post.image_width,
+            'height': post.image_height,
+            'placeholder': post.placeholder,
             'caption': post.caption,
             'can_delete': can_delete,
-            'likes_count': post.likes.count(),
+            'likes_count': post.likes_count,
             'liked_by_me': liked_by_me,
             'comments': comments_data,
-            'updated_at': post.updated_at.isoformat() if post.updated_at else post.created_at.isoformat(),
+            'updated_at': last_activity.isoformat() + 'Z',
             'created_at': post.created_at.isoformat()
         })
 
     return jsonify(data)
 
 
-@app.route('/api/comment/<int:post_id>', methods=['POST'])
+@bp.route('/api/comment/<int:post_id>', methods=['POST'])
 def add_comment(post_id):
     post = db.session.get(Post, post_id)
     if not post: return jsonify({'error': 'Not found'}), 404
@@ -835,8 +1292,8 @@ def add_comment(post_id):
         guest_id=guest_id,
         text=text
     )
+    # O post não é reescrito: check_updates encontra comentários novos pela data deles.
     db.session.add(new_comment)
-    post.updated_at = datetime.utcnow()
     db.session.commit()
 
     author_name = current_user.name or current_user.username if current_user.is_authenticated else guest_name
@@ -850,7 +1307,7 @@ def add_comment(post_id):
         }
     })
 
-@app.route('/api/delete/<int:post_id>', methods=['DELETE'])
+@bp.route('/api/delete/<int:post_id>', methods=['DELETE'])
 @login_required
 def delete_post(post_id):
     post = db.session.get(Post, post_id)
@@ -858,13 +1315,121 @@ def delete_post(post_id):
         return jsonify({'error': 'Post não encontrado'}), 404
 
     if post.author_id == current_user.id or post.room.owner_id == current_user.id:
+        release_drive_file(post.drive_file_id)
         db.session.delete(post)
         db.session.commit()
         return jsonify({'success': True})
     return jsonify({'error': 'Não autorizado'}), 403
 
 
-with app.app_context():
+def add_missing_columns(conn, table, columns):
+    """ALTER TABLE ADD COLUMN para as colunas (nome, DDL) que a tabela ainda não tem."""
+    existing = {c['name'] for c in sa_inspect(conn).get_columns(table)}
+    added = []
+    for name, ddl in columns:
+        if name not in existing:
+            conn.execute(db.text(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}"))
+            added.append(name)
+    return added
+
+
+def has_constraint_or_index(conn, table, name):
+    inspector = sa_inspect(conn)
+    names = {c['name'] for c in inspector.get_unique_constraints(table)}
+    names |= {i['name'] for i in inspector.get_indexes(table)}
+    return name in names
+
+
+def add_unique_constraint(conn, table, name, columns):
+    cols = ', '.join(columns)
+    if conn.dialect.name == 'sqlite':
+        # O SQLite não faz ALTER TABLE ADD CONSTRAINT; o índice único vale igual para o ON CONFLICT.
+        conn.execute(db.text(f"CREATE UNIQUE INDEX {name} ON {table} ({cols})"))
+    else:
+        conn.execute(db.text(f"ALTER TABLE {table} ADD CONSTRAINT {name} UNIQUE ({cols})"))
+
+
+def upgrade_schema():
+    """Leva um banco já existente ao esquema dos modelos.
+
+    O create_all só cria tabelas novas; colunas e constraints acrescentadas a
+    tabelas antigas entram aqui. Cada passo confere o esquema antes de alterar,
+    então rodar de novo não muda nada. Devolve a lista do que foi alterado.
+    """
+    changes = []
+    with db.engine.begin() as conn:
+        for name in add_missing_columns(conn, 'storage_account', [
+            ('reclaimed_bytes', 'BIGINT DEFAULT 0'),
+            ('last_gc_at', 'TIMESTAMP'),
+        ]):
+            changes.append(f"storage_account.{name}")
+
+        image_columns = [
+            ('image_width', 'INTEGER'),
+            ('image_height', 'INTEGER'),
+            ('placeholder', 'TEXT'),
+        ]
+        for table in ('post', 'drive_file'):
+            for name in add_missing_columns(conn, table, image_columns):
+                changes.append(f"{table}.{name}")
+
+        # Curtidas: antes das constraints únicas remove as duplicadas (fica a mais
+        # antiga) e, se algo mudou, recalcula o contador desnormalizado.
+        recount = bool(add_missing_columns(conn, 'post', [('likes_count', 'INTEGER NOT NULL DEFAULT 0')]))
+        if recount:
+            changes.append("post.likes_count")
+        for name, column in (('uq_post_like_user', 'user_id'), ('uq_post_like_guest', 'guest_id')):
+            if has_constraint_or_index(conn, 'post_like', name):
+                continue
+            removed = conn.execute(db.text(
+                f"DELETE FROM post_like WHERE {column} IS NOT NULL AND id NOT IN "
+                f"(SELECT MIN(id) FROM post_like WHERE {column} IS NOT NULL GROUP BY post_id, {column})"
+            )).rowcount
+            add_unique_constraint(conn, 'post_like', name, ['post_id', column])
+            changes.append(f"post_like.{name} ({removed} duplicadas removidas)")
+            recount = recount or removed > 0
+        if recount:
+            conn.execute(db.text(
+                "UPDATE post SET likes_count = (SELECT COUNT(*) FROM post_like WHERE post_like.post_id = post.id)"
+            ))
+
+        if not has_constraint_or_index(conn, 'post_comment', 'ix_post_comment_post_id'):
+            conn.execute(db.text("CREATE INDEX ix_post_comment_post_id ON post_comment (post_id)"))
+            changes.append("post_comment.ix_post_comment_post_id")
+    return changes
+
+
+@bp.cli.command('init-db')
+def init_db_command():
+    """Cria as tabelas que ainda não existem e atualiza as antigas."""
     db.create_all()
+    for change in upgrade_schema():
+        print(f"Esquema atualizado: {change}")
+    print("Banco de dados inicializado.")
 
 
+@bp.cli.command('drive-gc')
+@click.option('--loop', is_flag=True, help="Repete a cada DRIVE_GC_INTERVAL segundos (processo dedicado).")
+def drive_gc_command(loop):
+    """Apaga os arquivos órfãos do Drive, uma vez (cron) ou em laço com --loop."""
+    interval = current_app.config['DRIVE_GC_INTERVAL']
+    if loop and interval <= 0:
+        raise click.UsageError("DRIVE_GC_INTERVAL precisa ser maior que zero com --loop.")
+
+    while True:
+        try:
+            report = collect_drive_garbage()
+            if report is None:
+                print("Outra varredura do coletor está em andamento.")
+            for email, reclaimed in (report or {}).items():
+                print(f"{email}: {reclaimed} bytes liberados")
+        except Exception:
+            if not loop:
+                raise
+            current_app.logger.exception("Erro no coletor do Drive")
+        finally:
+            db.session.remove()
+
+        if not loop:
+            return
+        time.sleep(interval)
@@ -0,0 +1,163 @@
+"""Compressão de respostas e cache de longa duração para os arquivos estáticos.
+
+- HTML, JSON, CSS e JS acima de COMPRESS_MIN_SIZE saem com brotli (quando o
+  pacote está instalado) ou gzip, conforme o Accept-Encoding do navegador.
+- `url_for('static', ...)` ganha `?v=<hash do conteúdo>`; com o hash certo a
+  resposta é marcada como imutável por um ano, então o navegador nem revalida.
+- Os estáticos compressíveis são comprimidos uma vez por processo, no nível
+  máximo, e servidos direto da memória nas requisições seguintes.
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+import threading
+
+from flask import current_app, request, send_from_directory
+from werkzeug.security import safe_join
+from werkzeug.exceptions import NotFound
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+COMPRESSIBLE_TYPES = ('text/', 'application/json', 'application/javascript', 'image/svg+xml')
+
+_fingerprints = {}
+_static_variants = {}
+_lock = threading.Lock()
+
+
+def is_compressible(mimetype):
+    return bool(mimetype) and mimetype.startswith(COMPRESSIBLE_TYPES)
+
+
+def preferred_encoding():
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+
+def compress(data, encoding, best=False):
+    if encoding == 'br':
+        return brotli.compress(data, quality=11 if best else current_app.config['BROTLI_LEVEL'])
+    return gzip.compress(data, compresslevel=9 if best else current_app.config['GZIP_LEVEL'])
+
+
+def _static_file(filename):
+    """(caminho, mtime, tamanho) do arquivo estático ou None se não existir."""
+    path = safe_join(current_app.static_folder, filename)
+    if path is None:
+        return None
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return path, stat.st_mtime, stat.st_size
+
+
+def static_fingerprint(filename):
+    """Hash curto do conteúdo do arquivo, recalculado só quando o mtime muda."""
+    info = _static_file(filename)
+    if info is None:
+        return None
+    path, mtime, _ = info
+    cached = _fingerprints.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    with open(path, 'rb') as f:
+        digest = hashlib.sha256(f.read()).hexdigest()[:12]
+    _fingerprints[path] = (mtime, digest)
+    return digest
+
+
+def add_static_fingerprint(endpoint, values):
+    if endpoint == 'static' and 'filename' in values and 'v' not in values:
+        digest = static_fingerprint(values['filename'])
+        if digest:
+            values['v'] = digest
+
+
+def _compressed_static(path, mtime, encoding):
+    key = (path, encoding)
+    cached = _static_variants.get(key)
+    if cached and cached[0] == mtime:
+        return cached[1], cached[2]
+    with open(path, 'rb') as f:
+        data = compress(f.read(), encoding, best=True)
+    etag = hashlib.sha256(data).hexdigest()[:16]
+    with _lock:
+        _static_variants[key] = (mtime, data, etag)
+    return data, etag
+
+
+def send_static(filename):
+    """Substitui a view `static` do Flask: variantes comprimidas e cache imutável."""
+    info = _static_file(filename)
+    if info is None:
+        raise NotFound()
+    path, mtime, size = info
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+
+    encoding = None
+    if is_compressible(mimetype) and size >= current_app.config['COMPRESS_MIN_SIZE']:
+        encoding = preferred_encoding()
+
+    if encoding:
+        data, etag = _compressed_static(path, mtime, encoding)
+        response = current_app.response_class(data, mimetype=mimetype)
+        response.headers['Content-Encoding'] = encoding
+        response.set_etag(f"{etag}-{encoding}")
+        response.last_modified = mtime
+        # Igual ao send_from_directory: sem hash válido, o navegador revalida.
+        response.cache_control.no_cache = True
+        response.make_conditional(request)
+    else:
+        response = send_from_directory(current_app.static_folder, filename, mimetype=mimetype)
+
+    if is_compressible(mimetype):
+        response.vary.add('Accept-Encoding')
+
+    version = request.args.get('v')
+    if version and version == static_fingerprint(filename):
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.max_age = IMMUTABLE_MAX_AGE
+        response.cache_control.immutable = True
+    return response
+
+
+def compress_response(response):
+    """Comprime respostas dinâmicas (HTML, JSON) acima do limite de tamanho."""
+    if (response.direct_passthrough or response.is_streamed
+            or response.status_code < 200 or response.status_code in (204, 304)
+            or 'Content-Encoding' in response.headers
+            or not is_compressible(response.mimetype)):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    encoding = preferred_encoding()
+    if encoding is None or request.method == 'HEAD':
+        return response
+
+    data = response.get_data()
+    if len(data) < current_app.config['COMPRESS_MIN_SIZE']:
+        return response
+
+    response.set_data(compress(data, encoding))
+    response.headers['Content-Encoding'] = encoding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def init_app(app):
+    app.url_defaults(add_static_fingerprint)
+    app.view_functions['static'] = send_static
+    app.after_request(compress_response)
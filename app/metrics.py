@@ -0,0 +1,252 @@
+"""Métricas no formato texto do Prometheus.
+
+Cada processo acumula os valores em memória. Com vários workers (gunicorn) o
+scrape cai num worker qualquer, então com PROMETHEUS_MULTIPROC_DIR cada
+processo grava um retrato dos seus valores em <dir>/<pid>.json (no máximo a
+cada FLUSH_INTERVAL segundos) e /admin/metrics soma todos os arquivos. Os
+arquivos de workers que morreram ficam, para os contadores não voltarem; o
+gunicorn.conf.py limpa o diretório ao subir o master.
+"""
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+FLUSH_INTERVAL = 1.0
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(pairs):
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in pairs) + '}'
+
+
+def _fmt(value):
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name, help_text, labelnames=(), registry=None):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        self.lock = threading.Lock()
+        self.registry = registry
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels.get(n, '')) for n in self.labelnames)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+        if self.registry:
+            self.registry.changed()
+
+    def dump(self):
+        with self.lock:
+            return [[list(key), value] for key, value in self.values.items()]
+
+    @staticmethod
+    def merge(values, dumped):
+        for key, value in dumped:
+            key = tuple(key)
+            values[key] = values.get(key, 0) + value
+
+    def samples(self, values=None):
+        if values is None:
+            with self.lock:
+                values = dict(self.values)
+        for key, value in sorted(values.items()):
+            yield self.name, list(zip(self.labelnames, key)), value
+
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS, registry=None):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+        self.values = {}
+        self.lock = threading.Lock()
+        self.registry = registry
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(n, '')) for n in self.labelnames)
+        with self.lock:
+            counts, total = self.values.get(key, ([0] * len(self.buckets), 0.0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self.values[key] = (counts, total + value)
+        if self.registry:
+            self.registry.changed()
+
+    def dump(self):
+        with self.lock:
+            return [[list(key), list(counts), total] for key, (counts, total) in self.values.items()]
+
+    @staticmethod
+    def merge(values, dumped):
+        for key, counts, total in dumped:
+            key = tuple(key)
+            if key in values:
+                old_counts, old_total = values[key]
+                counts = [a + b for a, b in zip(old_counts, counts)]
+                total += old_total
+            values[key] = (list(counts), total)
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self, values=None):
+        if values is None:
+            with self.lock:
+                values = {k: (list(c), s) for k, (c, s) in self.values.items()}
+        for key, (counts, total) in sorted(values.items()):
+            pairs = list(zip(self.labelnames, key))
+            for bound, count in zip(self.buckets, counts):
+                yield f"{self.name}_bucket", pairs + [('le', _fmt(bound))], count
+            yield f"{self.name}_sum", pairs, total
+            yield f"{self.name}_count", pairs, counts[-1]
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+        self.directory = None
+        self.dirty = False
+        self.flusher_pid = None
+        self.flush_lock = threading.Lock()
+
+    def counter(self, name, help_text, labelnames=()):
+        metric = Counter(name, help_text, labelnames, registry=self)
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        metric = Histogram(name, help_text, labelnames, buckets, registry=self)
+        self.metrics.append(metric)
+        return metric
+
+    def enable_multiprocess(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+
+    def changed(self):
+        self.dirty = True
+        # A thread de gravação não sobrevive ao fork: cada worker sobe a sua.
+        if self.directory and self.flusher_pid != os.getpid():
+            with self.flush_lock:
+                if self.flusher_pid != os.getpid():
+                    self.flusher_pid = os.getpid()
+                    threading.Thread(target=self._flush_loop, name='metrics-flush', daemon=True).start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(FLUSH_INTERVAL)
+            if self.dirty:
+                try:
+                    self.flush()
+                except Exception:
+                    logging.getLogger(__name__).exception("Falha ao gravar as métricas em %s", self.directory)
+
+    def flush(self):
+        self.dirty = False
+        snapshot = {metric.name: metric.dump() for metric in self.metrics}
+        path = os.path.join(self.directory, f"{os.getpid()}.json")
+        with open(path + '.tmp', 'w') as f:
+            json.dump(snapshot, f)
+        os.replace(path + '.tmp', path)
+
+    def collect(self):
+        """{nome: valores} somando os retratos de todos os processos do diretório."""
+        if self.dirty:
+            self.flush()
+        merged = {metric.name: {} for metric in self.metrics}
+        by_name = {metric.name: metric for metric in self.metrics}
+        for path in glob.glob(os.path.join(self.directory, '*.json')):
+            try:
+                with open(path) as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError):
+                continue
+            for name, dumped in snapshot.items():
+                if name in by_name:
+                    by_name[name].merge(merged[name], dumped)
+        return merged
+
+    def render(self):
+        merged = self.collect() if self.directory else {}
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, pairs, value in metric.samples(merged.get(metric.name)):
+                lines.append(f"{name}{_labels(pairs)} {_fmt(value)}")
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+BYTES_BUCKETS = (16e3, 64e3, 256e3, 1e6, 2e6, 5e6, 10e6, 20e6, 32e6)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+request_duration = registry.histogram(
+    'pretitudes_request_duration_seconds', "Latência das requisições HTTP, até o fim do corpo.",
+    ('route', 'method', 'status'))
+request_queries = registry.histogram(
+    'pretitudes_request_sql_queries', "Consultas SQL por requisição.",
+    ('route',), COUNT_BUCKETS)
+request_sql_duration = registry.histogram(
+    'pretitudes_request_sql_seconds', "Tempo em SQL por requisição.",
+    ('route',))
+sql_queries = registry.counter(
+    'pretitudes_sql_queries_total', "Consultas SQL executadas (inclui trabalho fora de requisições).")
+drive_duration = registry.histogram(
+    'pretitudes_drive_request_duration_seconds', "Latência das chamadas ao Google Drive/OAuth.",
+    ('operation',))
+drive_errors = registry.counter(
+    'pretitudes_drive_errors_total', "Chamadas ao Google Drive/OAuth que falharam.",
+    ('operation',))
+image_duration = registry.histogram(
+    'pretitudes_image_processing_seconds', "Tempo de compress_image_if_needed.")
+image_input_bytes = registry.histogram(
+    'pretitudes_image_input_bytes', "Tamanho das imagens recebidas.",
+    buckets=BYTES_BUCKETS)
+image_output_bytes = registry.histogram(
+    'pretitudes_image_output_bytes', "Tamanho das imagens após a compressão.",
+    buckets=BYTES_BUCKETS)
+
+
+@contextmanager
+def track_drive(operation):
+    """Mede uma chamada ao Drive; exceções contam como erro e são propagadas."""
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        drive_errors.inc(operation=operation)
+        raise
+    finally:
+        drive_duration.observe(time.perf_counter() - started, operation=operation)
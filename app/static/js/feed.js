@@ -0,0 +1,340 @@
+const roomHash = document.getElementById('roomData').dataset.hash;
+const feedContainer = document.getElementById('feed-container');
+let pollingInterval = null;
+
+function escapeHTML(str) {
+    if (!str) return '';
+    return str.toString()
+        .replace(/&/g, "&amp;")
+        .replace(/</g, "&lt;")
+        .replace(/>/g, "&gt;")
+        .replace(/"/g, "&quot;")
+        .replace(/'/g, "&#039;");
+}
+
+function toggleComments(postId) {
+    const commentsSection = document.getElementById(`comments-${postId}`);
+    if (commentsSection.style.display === 'none' || commentsSection.style.display === '') {
+        commentsSection.style.display = 'block';
+    } else {
+        commentsSection.style.display = 'none';
+    }
+}
+
+function startPolling() {
+    if (pollingInterval) clearInterval(pollingInterval);
+    pollingInterval = setInterval(async () => {
+        const lastTime = feedContainer.dataset.lastTime || "1970-01-01T00:00:00Z";
+        try {
+            const res = await fetch(`/api/updates/${roomHash}?since_time=${encodeURIComponent(lastTime)}`);
+            if (!res.ok) return;
+
+            const text = await res.text();
+            let posts = [];
+            try {
+                posts = text ? JSON.parse(text) : [];
+            } catch (e) {
+                console.error("JSON parse error:", e);
+            }
+
+            if (posts.length > 0) {
+                const emptyState = document.getElementById('empty-state');
+                if (emptyState) emptyState.remove();
+
+                // Guarda o texto do servidor: Date só tem milissegundos e, ao
+                // arredondar para baixo, o mesmo post voltaria em toda consulta.
+                let maxTime = new Date(lastTime).getTime();
+                let maxStamp = lastTime;
+
+                posts.forEach(post => {
+                    const postTime = new Date(post.updated_at).getTime();
+                    if (postTime >= maxTime) {
+                        maxTime = postTime;
+                        maxStamp = post.updated_at;
+                    }
+
+                    const existingCard = document.getElementById(`post-${post.id}`);
+                    if (existingCard) {
+                        // Update likes
+                        const likeBtn = existingCard.querySelector('.btn-like');
+                        const likeIcon = likeBtn.querySelector('i');
+                        const likeCount = likeBtn.querySelector('span');
+
+                        likeCount.innerText = post.likes_count;
+                        if (post.liked_by_me) {
+                            likeIcon.classList.remove('far');
+                            likeIcon.classList.add('fas');
+                        } else {
+                            likeIcon.classList.remove('fas');
+                            likeIcon.classList.add('far');
+                        }
+
+                        // Update comments
+                        const commentList = document.getElementById(`comment-list-${post.id}`);
+                        const commentCountBtn = document.getElementById(`comment-count-${post.id}`);
+                        if (commentCountBtn && post.comments) {
+                            commentCountBtn.innerText = post.comments.length;
+                        }
+
+                        if (commentList && post.comments) {
+                            const oldScrollTop = commentList.scrollTop;
+                            const oldScrollHeight = commentList.scrollHeight;
+
+                            let commentsHtml = '';
+                            post.comments.forEach(c => {
+                                commentsHtml += `
+                                <div class="comment">
+                                    <span class="comment-author">${escapeHTML(c.author_name)}:</span>
+                                    <span>${escapeHTML(c.text)}</span>
+                                </div>`;
+                            });
+
+                            if (commentList.innerHTML !== commentsHtml) {
+                                const isAtBottom = Math.abs(commentList.scrollHeight - commentList.scrollTop - commentList.clientHeight) <= 5;
+                                commentList.innerHTML = commentsHtml;
+
+                                if (isAtBottom && commentList.scrollHeight > oldScrollHeight) {
+                                    commentList.scrollTop = commentList.scrollHeight;
+                                } else {
+                                    commentList.scrollTop = oldScrollTop;
+                                }
+                            }
+                        }
+
+                    } else {
+                        const html = createPostCard(post);
+                        feedContainer.insertAdjacentHTML('afterbegin', html);
+                    }
+                });
+
+                feedContainer.dataset.lastTime = maxStamp;
+            }
+        } catch (e) {
+            console.error("Erro na atualização:", e);
+        }
+    }, 5000);
+}
+
+function createPostCard(post) {
+    let avatarHtml = '';
+    if (post.author_avatar) {
+        avatarHtml = `<img src="${post.author_avatar}" class="user-avatar" referrerpolicy="no-referrer">`;
+    } else {
+        avatarHtml = `<div class="user-avatar-placeholder">${post.author_initial}</div>`;
+    }
+
+    let deleteBtn = '';
+    if (post.can_delete) {
+        deleteBtn = `<button class="btn-delete" onclick="deletePost(${post.id})"><i class="fas fa-trash"></i></button>`;
+    }
+
+    let captionHtml = '';
+    if (post.caption) {
+        captionHtml = `<div class="card-caption">${post.caption}</div>`;
+    }
+
+    const heartClass = post.liked_by_me ? 'fas' : 'far';
+
+    let sizeAttrs = '';
+    if (post.width && post.height) {
+        sizeAttrs = `width="${post.width}" height="${post.height}"`;
+    }
+    if (post.placeholder) {
+        sizeAttrs += ` style="background-image: url('${post.placeholder}');"`;
+    }
+
+    let commentsHtml = '';
+    if (post.comments) {
+        post.comments.forEach(c => {
+            commentsHtml += `
+            <div class="comment">
+                <span class="comment-author">${escapeHTML(c.author_name)}:</span>
+                <span>${escapeHTML(c.text)}</span>
+            </div>`;
+        });
+    }
+
+    return `
+    <div class="post-card new-post-animation" id="post-${post.id}">
+        <div class="card-header">
+            ${avatarHtml}
+            <span class="card-user-name">${escapeHTML(post.author_name)}</span>
+            ${deleteBtn}
+        </div>
+        <div class="card-photo-area">
+            <img src="${post.image_url}" loading="lazy" ${sizeAttrs}
+                 onerror="this.onerror=null; this.src='https://placehold.co/400x400/efebe9/654321?text=Imagem+Indispon%C3%ADvel';">
+            <div class="card-actions">
+                <button class="btn-like" onclick="toggleLike(${post.id}, this)">
+                    <i class="${heartClass} fa-heart"></i>
+                    <span>${post.likes_count}</span>
+                </button>
+                <button class="btn-toggle-comments" onclick="toggleComments(${post.id})">
+                    <i class="far fa-comment"></i>
+                    <span id="comment-count-${post.id}">${post.comments ? post.comments.length : 0}</span>
+                </button>
+            </div>
+            ${captionHtml}
+
+            <div class="comments-section" id="comments-${post.id}">
+                <div class="comment-list" id="comment-list-${post.id}">
+                    ${commentsHtml}
+                </div>
+                <div class="comment-input-container">
+                    <input type="text" class="comment-input" id="comment-input-${post.id}" placeholder="Adicionar comentário..." onkeypress="if(event.key === 'Enter') submitComment(${post.id})">
+                    <button class="btn-comment" id="btn-comment-${post.id}" onclick="submitComment(${post.id})"><i class="fas fa-paper-plane"></i></button>
+                </div>
+            </div>
+        </div>
+    </div>`;
+}
+
+async function submitComment(postId) {
+    const input = document.getElementById(`comment-input-${postId}`);
+    const btn = document.getElementById(`btn-comment-${postId}`);
+    const text = input.value.trim();
+    if (!text) return;
+
+    btn.disabled = true;
+
+    try {
+        const res = await fetch(`/api/comment/${postId}`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ text })
+        });
+
+        const resText = await res.text();
+        let data = {};
+        try {
+            data = JSON.parse(resText);
+        } catch(e) {}
+
+        if (res.ok && data.success) {
+            input.value = '';
+            const list = document.getElementById(`comment-list-${postId}`);
+            list.innerHTML += `
+            <div class="comment new-post-animation">
+                <span class="comment-author">${escapeHTML(data.comment.author_name)}:</span>
+                <span>${escapeHTML(data.comment.text)}</span>
+            </div>`;
+            list.scrollTop = list.scrollHeight;
+
+            const commentCountBtn = document.getElementById(`comment-count-${postId}`);
+            if (commentCountBtn) {
+                commentCountBtn.innerText = parseInt(commentCountBtn.innerText) + 1;
+            }
+        } else {
+            alert("Erro ao adicionar comentário.");
+        }
+    } catch (e) {
+        console.error(e);
+        alert("Erro ao conectar ao servidor.");
+    } finally {
+        btn.disabled = false;
+    }
+}
+
+async function toggleLike(postId, btn) {
+    const icon = btn.querySelector('i');
+    const span = btn.querySelector('span');
+    let count = parseInt(span.innerText);
+    const isLiked = icon.classList.contains('fas');
+
+    icon.classList.toggle('fas');
+    icon.classList.toggle('far');
+    span.innerText = isLiked ? Math.max(0, count - 1) : count + 1;
+
+    try {
+        const res = await fetch(`/api/like/${postId}`, { method: 'POST' });
+        const text = await res.text();
+        let data = {};
+        try {
+            data = text ? JSON.parse(text) : {};
+        } catch (e) {
+            throw new Error("Erro de servidor (" + res.status + ")");
+        }
+        if (data.error) throw new Error(data.error);
+
+        span.innerText = data.count;
+        if (data.liked) {
+             icon.classList.remove('far'); icon.classList.add('fas');
+        } else {
+             icon.classList.remove('fas'); icon.classList.add('far');
+        }
+    } catch (e) {
+        console.error(e);
+        icon.classList.toggle('fas');
+        icon.classList.toggle('far');
+        span.innerText = count;
+    }
+}
+
+startPolling();
+
+function openPostModal() { document.getElementById('postModal').style.display = 'flex'; }
+
+function closePostModal() {
+    document.getElementById('postModal').style.display = 'none';
+    document.getElementById('postFileInput').value = '';
+    document.getElementById('captionInput').value = '';
+}
+
+async function submitPost() {
+    const fileInput = document.getElementById('postFileInput');
+    const caption = document.getElementById('captionInput').value;
+    const btn = document.getElementById('btnSubmit');
+
+    if (fileInput.files.length === 0) return alert("Escolha uma foto!");
+
+    const originalText = btn.innerText;
+    btn.innerText = "Enviando..."; btn.disabled = true; btn.style.opacity = "0.7";
+
+    const formData = new FormData();
+    formData.append('photo', fileInput.files[0]);
+    formData.append('caption', caption);
+
+    try {
+        const res = await fetch(`/api/post/${roomHash}`, { method: 'POST', body: formData });
+        const text = await res.text();
+        let data = {};
+        try {
+            data = text ? JSON.parse(text) : {};
+        } catch (e) {
+            throw new Error("Erro de servidor (" + res.status + ")");
+        }
+
+        if (res.ok) {
+            closePostModal();
+            btn.innerText = "Sucesso!";
+            setTimeout(() => {
+                btn.innerText = originalText;
+                btn.disabled = false;
+                btn.style.opacity = "1";
+            }, 1000);
+        } else {
+            throw new Error(data.error);
+        }
+    } catch (e) {
+        alert("Erro: " + e.message);
+        btn.innerText = originalText; btn.disabled = false; btn.style.opacity = "1";
+    }
+}
+
+async function deletePost(postId) {
+    if(!confirm("Remover esta memória?")) return;
+    try {
+        const res = await fetch(`/api/delete/${postId}`, { method: 'DELETE' });
+        if (res.ok) {
+            const el = document.getElementById(`post-${postId}`);
+            el.style.transform = "scale(0)";
+            setTimeout(() => {
+                el.remove();
+            }, 300);
+        }
+    } catch (e) { console.error(e); }
+}
+
+window.onclick = function(event) {
+    if (event.target == document.getElementById('postModal')) closePostModal();
+}
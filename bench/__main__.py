@@ -0,0 +1,241 @@
+"""Benchmarks de carga do Pretitudes contra um Drive local.
+
+    python -m bench --posts 100 --requests 300 --concurrency 8 --output bench.json
+    python -m bench.compare base.json bench.json
+
+Sobe o Drive falso (bench/fake_drive.py), popula um banco SQLite temporário
+(ou --db-url, que é apagado e só é aceito com --force) e roda os cenários pelo cliente de teste do Flask, medindo
+vazão, latência p50/p95/p99 e consultas SQL por requisição. A saída é JSON
+para comparar entre commits.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from bench.fake_drive import FakeDrive
+from bench.seed import seed, make_image
+
+SCENARIOS = ['feed', 'poll', 'poll_full', 'like', 'comment', 'upload', 'proxy']
+
+
+class QueryCounter:
+    """Conta consultas e tempo de SQL por thread via eventos do SQLAlchemy."""
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+        self.local = threading.local()
+        event.listen(engine, 'before_cursor_execute', self.before)
+        event.listen(engine, 'after_cursor_execute', self.after)
+
+    def before(self, conn, cursor, statement, parameters, context, executemany):
+        self.local.started = time.perf_counter()
+
+    def after(self, conn, cursor, statement, parameters, context, executemany):
+        self.local.count = getattr(self.local, 'count', 0) + 1
+        self.local.seconds = getattr(self.local, 'seconds', 0.0) + time.perf_counter() - self.local.started
+
+    def reset(self):
+        self.local.count = 0
+        self.local.seconds = 0.0
+
+    def read(self):
+        return getattr(self.local, 'count', 0), getattr(self.local, 'seconds', 0.0)
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def summarize(samples, errors, seconds):
+    latencies = sorted(s[0] for s in samples)
+    count = len(samples)
+    return {
+        'requests': count,
+        'errors': errors,
+        'seconds': round(seconds, 4),
+        'throughput_rps': round(count / seconds, 2) if seconds else 0.0,
+        'latency_ms': {
+            'mean': round(sum(latencies) / count * 1000, 3) if count else 0.0,
+            'p50': round(percentile(latencies, 50) * 1000, 3),
+            'p95': round(percentile(latencies, 95) * 1000, 3),
+            'p99': round(percentile(latencies, 99) * 1000, 3),
+            'max': round(latencies[-1] * 1000, 3) if latencies else 0.0,
+        },
+        'sql_queries_per_request': round(sum(s[1] for s in samples) / count, 2) if count else 0.0,
+        'sql_ms_per_request': round(sum(s[2] for s in samples) / count * 1000, 3) if count else 0.0,
+    }
+
+
+class Bench:
+    def __init__(self, app, rooms, counter, concurrency):
+        self.app = app
+        self.rooms = rooms
+        self.room = rooms[0]
+        self.counter = counter
+        self.concurrency = concurrency
+        self.local = threading.local()
+        self.sequence = 0
+        self.sequence_lock = threading.Lock()
+
+    def next_index(self):
+        with self.sequence_lock:
+            self.sequence += 1
+            return self.sequence
+
+    def client(self):
+        client = getattr(self.local, 'client', None)
+        if client is None:
+            client = self.app.test_client()
+            name = f"Bench {threading.get_ident()}"
+            client.post(f"/room/{self.room['hash']}/auth", data={'guest_name': name})
+            self.local.client = client
+        return client
+
+    # Cada cenário devolve (preparo, requisição); só a requisição é cronometrada.
+    def feed(self, i):
+        return None, lambda c: c.get(f"/join/{self.room['hash']}")
+
+    def poll(self, i):
+        since = datetime.utcnow().isoformat() + 'Z'
+        return None, lambda c: c.get(f"/api/updates/{self.room['hash']}?since_time={since}")
+
+    def poll_full(self, i):
+        return None, lambda c: c.get(f"/api/updates/{self.room['hash']}?since_time=1970-01-01T00:00:00Z")
+
+    def like(self, i):
+        post_id = self.room['post_ids'][i % len(self.room['post_ids'])]
+        return None, lambda c: c.post(f"/api/like/{post_id}")
+
+    def comment(self, i):
+        post_id = self.room['post_ids'][i % len(self.room['post_ids'])]
+        return None, lambda c: c.post(f"/api/comment/{post_id}", json={'text': f"bench {i}"})
+
+    def upload(self, i):
+        import io
+        data = make_image(('upload', i))
+        return data, lambda c: c.post(
+            f"/api/post/{self.room['hash']}",
+            data={'photo': (io.BytesIO(data), f"bench_{i}.jpg"), 'caption': f"upload {i}"},
+            content_type='multipart/form-data'
+        )
+
+    def proxy(self, i):
+        file_id = self.room['file_ids'][i % len(self.room['file_ids'])]
+        return None, lambda c: c.get(f"/cdn/{file_id}")
+
+    def run_one(self, scenario):
+        client = self.client()
+        i = self.next_index()
+        _, call = getattr(self, scenario)(i)
+        self.counter.reset()
+        started = time.perf_counter()
+        response = call(client)
+        response.get_data()
+        response.close()
+        elapsed = time.perf_counter() - started
+        queries, sql_seconds = self.counter.read()
+        return elapsed, queries, sql_seconds, response.status_code
+
+    def run(self, scenario, requests):
+        samples = []
+        errors = 0
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            for elapsed, queries, sql_seconds, status in pool.map(lambda _: self.run_one(scenario), range(requests)):
+                samples.append((elapsed, queries, sql_seconds))
+                if status >= 400:
+                    errors += 1
+        return summarize(samples, errors, time.perf_counter() - started)
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de carga do Pretitudes.")
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help="lista separada por vírgulas")
+    parser.add_argument('--requests', type=int, default=200, help="requisições por cenário")
+    parser.add_argument('--upload-requests', type=int, default=20, help="requisições no cenário upload")
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--rooms', type=int, default=1)
+    parser.add_argument('--posts', type=int, default=50)
+    parser.add_argument('--likes', type=int, default=5, help="curtidas por post")
+    parser.add_argument('--comments', type=int, default=3, help="comentários por post")
+    parser.add_argument('--drive-latency', type=float, default=0.0, help="segundos por chamada ao Drive")
+    parser.add_argument('--drive-bandwidth', type=int, default=None, help="bytes/s no download do Drive")
+    parser.add_argument('--db-url', default=None, help="padrão: SQLite temporário")
+    parser.add_argument('--force', action='store_true', help="permite apagar um --db-url que não é temporário")
+    parser.add_argument('--output', default=None, help="arquivo JSON (padrão: stdout)")
+    args = parser.parse_args(argv)
+
+    scenarios = [s.strip() for s in args.scenarios.split(',') if s.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"cenários desconhecidos: {', '.join(sorted(unknown))}")
+
+    drive = FakeDrive(latency=args.drive_latency, bandwidth=args.drive_bandwidth)
+    drive.start()
+
+    workdir = tempfile.mkdtemp(prefix='pretitudes_bench_')
+    os.environ.update(drive.env())
+    os.environ['isProd'] = 'false'
+    os.environ.setdefault('SECRET_KEY', 'bench')
+    db_url = args.db_url or f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+
+    from app import create_app
+    from app.app import db
+
+    app = create_app({'SQLALCHEMY_DATABASE_URI': db_url})
+
+    rooms = seed(app, drive, rooms=args.rooms, posts=args.posts, likes=args.likes, comments=args.comments, force=args.force)
+
+    with app.app_context():
+        counter = QueryCounter(db.engine)
+
+    bench = Bench(app, rooms, counter, args.concurrency)
+    results = {}
+    for scenario in scenarios:
+        requests = args.upload_requests if scenario == 'upload' else args.requests
+        drive.calls.clear()
+        results[scenario] = bench.run(scenario, requests)
+        results[scenario]['drive_calls'] = dict(drive.calls)
+        print(f"{scenario}: {results[scenario]['throughput_rps']} req/s, "
+              f"p95 {results[scenario]['latency_ms']['p95']} ms", file=sys.stderr)
+
+    drive.stop()
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': datetime.utcnow().isoformat() + 'Z',
+            'python': platform.python_version(),
+            'args': vars(args),
+        },
+        'scenarios': results,
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    main()
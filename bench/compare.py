@@ -0,0 +1,46 @@
+"""Compara dois relatórios de `python -m bench`.
+
+    python -m bench.compare base.json head.json
+"""
+import argparse
+import json
+
+METRICS = [
+    ('throughput_rps', lambda s: s['throughput_rps'], 'req/s'),
+    ('p50', lambda s: s['latency_ms']['p50'], 'ms'),
+    ('p95', lambda s: s['latency_ms']['p95'], 'ms'),
+    ('p99', lambda s: s['latency_ms']['p99'], 'ms'),
+    ('sql', lambda s: s['sql_queries_per_request'], 'q/req'),
+]
+
+
+def change(old, new):
+    if not old:
+        return '   n/a'
+    return f"{(new - old) / old * 100:+6.1f}%"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compara dois relatórios de benchmark.")
+    parser.add_argument('base')
+    parser.add_argument('head')
+    args = parser.parse_args(argv)
+
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.head) as f:
+        head = json.load(f)
+
+    print(f"base {base['meta'].get('commit')} -> head {head['meta'].get('commit')}")
+    for scenario, new in head['scenarios'].items():
+        old = base['scenarios'].get(scenario)
+        if not old:
+            print(f"\n{scenario}: (novo)")
+            continue
+        print(f"\n{scenario}:")
+        for name, get, unit in METRICS:
+            print(f"  {name:<15} {get(old):>10} -> {get(new):>10} {unit:<6} {change(get(old), get(new))}")
+
+
+if __name__ == '__main__':
+    main()
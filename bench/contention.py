@@ -0,0 +1,153 @@
+"""Martela um único post com curtidas concorrentes e confere a consistência.
+
+    python -m bench.contention --guests 16 --taps-per-guest 2 --toggles 50
+
+Cada convidado pode ter vários clientes com a mesma sessão (toques duplos em
+aparelhos diferentes). No fim verifica que não há curtidas duplicadas, que
+Post.likes_count bate com as linhas de PostLike, que curtir um post apagado
+dá 404 e, quando cada convidado tem um só cliente, que o estado final segue a
+paridade dos toques. Sai com código 1 se alguma verificação falhar.
+
+O SQLite padrão não tem locks de linha nem aplica chaves estrangeiras; rode
+também contra o PostgreSQL de produção (o banco é apagado):
+
+    python -m bench.contention --db-url postgresql://localhost/pretitudes_bench --force
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from bench.__main__ import percentile
+from bench.seed import ensure_disposable
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Curtidas concorrentes em um único post.")
+    parser.add_argument('--guests', type=int, default=16)
+    parser.add_argument('--taps-per-guest', type=int, default=1, help="clientes simultâneos por convidado")
+    parser.add_argument('--toggles', type=int, default=50, help="toques por cliente")
+    parser.add_argument('--db-url', default=None, help="padrão: SQLite temporário")
+    parser.add_argument('--force', action='store_true', help="permite apagar um --db-url que não é temporário")
+    parser.add_argument('--output', default=None, help="arquivo JSON (padrão: stdout)")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix='pretitudes_contention_')
+    os.environ['isProd'] = 'false'
+    os.environ.setdefault('SECRET_KEY', 'bench')
+    db_url = args.db_url or f"sqlite:///{os.path.join(workdir, 'contention.db')}"
+    ensure_disposable(db_url, args.force)
+
+    from sqlalchemy import func
+    from app import create_app
+    from app.app import db, User, Room, Post, PostLike
+
+    app = create_app({'SQLALCHEMY_DATABASE_URI': db_url})
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        host = User(username='bench_host', name='Bench Host')
+        host.set_password('bench')
+        db.session.add(host)
+        db.session.flush()
+        db.session.add(Room(hash_id='contention', owner_id=host.id, institution='Bench', name='Sala', code='CONTND'))
+        post = Post(room_hash='contention', guest_name='Bench', image_url='/cdn/mock_bench', drive_file_id='mock_bench')
+        gone = Post(room_hash='contention', guest_name='Bench', image_url='/cdn/mock_gone', drive_file_id='mock_gone')
+        db.session.add_all([post, gone])
+        db.session.commit()
+        post_id, gone_id = post.id, gone.id
+        db.session.delete(gone)
+        db.session.commit()
+
+    # Um cliente por (convidado, toque); clientes do mesmo convidado dividem o cookie de sessão.
+    clients = []
+    for g in range(args.guests):
+        first = app.test_client()
+        first.post('/room/contention/auth', data={'guest_name': f"Convidado {g}"})
+        first.post(f"/api/like/{post_id}")  # cria o guest_id na sessão
+        first.post(f"/api/like/{post_id}")  # e volta ao estado inicial
+        cookie = first.get_cookie('session')
+        clients.append((g, first))
+        for _ in range(args.taps_per_guest - 1):
+            other = app.test_client()
+            other.set_cookie('session', cookie.value)
+            clients.append((g, other))
+
+    last_state = {}
+    state_lock = threading.Lock()
+
+    def hammer(entry):
+        guest, client = entry
+        latencies = []
+        errors = 0
+        for _ in range(args.toggles):
+            started = time.perf_counter()
+            res = client.post(f"/api/like/{post_id}")
+            latencies.append(time.perf_counter() - started)
+            if res.status_code != 200:
+                errors += 1
+                continue
+            with state_lock:
+                last_state[guest] = res.get_json()['liked']
+        return latencies, errors
+
+    started = time.perf_counter()
+    latencies, errors = [], 0
+    with ThreadPoolExecutor(max_workers=len(clients)) as pool:
+        for lat, err in pool.map(hammer, clients):
+            latencies.extend(lat)
+            errors += err
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+
+    with app.app_context():
+        rows = db.session.query(func.count(PostLike.id)).filter_by(post_id=post_id).scalar()
+        duplicates = db.session.query(PostLike.guest_id).filter_by(post_id=post_id) \
+            .group_by(PostLike.guest_id).having(func.count(PostLike.id) > 1).count()
+        counter = db.session.get(Post, post_id).likes_count
+
+    gone_status = clients[0][1].post(f"/api/like/{gone_id}").status_code
+
+    checks = {
+        'no_duplicate_likes': duplicates == 0,
+        'counter_matches_rows': counter == rows,
+        'no_errors': errors == 0,
+        'deleted_post_404': gone_status == 404,
+    }
+    if args.taps_per_guest == 1:
+        expected = args.guests if args.toggles % 2 else 0
+        checks['parity'] = rows == expected and all(v == bool(args.toggles % 2) for v in last_state.values())
+
+    report = {
+        'args': vars(args),
+        'toggles': len(latencies),
+        'errors': errors,
+        'seconds': round(elapsed, 4),
+        'throughput_rps': round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        'latency_ms': {
+            'p50': round(percentile(latencies, 50) * 1000, 3),
+            'p95': round(percentile(latencies, 95) * 1000, 3),
+            'p99': round(percentile(latencies, 99) * 1000, 3),
+        },
+        'like_rows': rows,
+        'likes_count': counter,
+        'checks': checks,
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+    if not all(checks.values()):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""Confere o coletor de lixo do Drive contra o Drive falso.
+
+    python -m bench.drive_gc --runners 4 --orphans 30
+
+Popula o banco e o Drive falso, acrescenta órfãos antigos, um órfão recente e
+um arquivo fora da pasta, e dispara --runners varreduras ao mesmo tempo. No
+fim verifica que só os órfãos antigos sumiram, que nenhum foi apagado duas
+vezes e que os bytes liberados (retorno e StorageAccount.reclaimed_bytes)
+batem com o tamanho deles. Sai com código 1 se alguma verificação falhar.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from bench.fake_drive import FakeDrive
+from bench.seed import seed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Varreduras concorrentes do coletor do Drive.")
+    parser.add_argument('--runners', type=int, default=4, help="varreduras simultâneas")
+    parser.add_argument('--orphans', type=int, default=30)
+    parser.add_argument('--posts', type=int, default=10)
+    parser.add_argument('--drive-latency', type=float, default=0.02, help="segundos por chamada ao Drive")
+    parser.add_argument('--db-url', default=None, help="padrão: SQLite temporário")
+    parser.add_argument('--force', action='store_true', help="permite apagar um --db-url que não é temporário")
+    parser.add_argument('--output', default=None, help="arquivo JSON (padrão: stdout)")
+    args = parser.parse_args(argv)
+
+    drive = FakeDrive(latency=args.drive_latency)
+    drive.start()
+
+    workdir = tempfile.mkdtemp(prefix='pretitudes_drive_gc_')
+    os.environ.update(drive.env())
+    os.environ['isProd'] = 'false'
+    os.environ.setdefault('SECRET_KEY', 'bench')
+    db_url = args.db_url or f"sqlite:///{os.path.join(workdir, 'drive_gc.db')}"
+
+    from app import create_app
+    from app.app import db, StorageAccount, collect_drive_garbage
+
+    app = create_app({'SQLALCHEMY_DATABASE_URI': db_url, 'DRIVE_GC_MIN_AGE': 3600})
+    room = seed(app, drive, posts=args.posts, likes=0, comments=0, force=args.force)[0]
+
+    folder = drive.folder_id()
+    old = (datetime.now(timezone.utc) - timedelta(hours=2)).isoformat().replace('+00:00', 'Z')
+    orphans = []
+    for i in range(args.orphans):
+        file_id = drive.add_file(f"orphan_{i}.jpg", os.urandom(100 + i), 'image/jpeg', [folder])
+        drive.files[file_id]['createdTime'] = old
+        orphans.append(file_id)
+    orphan_bytes = sum(100 + i for i in range(args.orphans))
+    recent = drive.add_file('recent.jpg', b'r' * 64, 'image/jpeg', [folder])
+    outside = drive.add_file('outside.jpg', b'o' * 64, 'image/jpeg')
+    drive.files[outside]['createdTime'] = old
+    drive.calls.clear()
+
+    barrier = threading.Barrier(args.runners)
+    reports = []
+    reports_lock = threading.Lock()
+
+    def sweep():
+        barrier.wait()
+        with app.app_context():
+            try:
+                report = collect_drive_garbage()
+            finally:
+                db.session.remove()
+        with reports_lock:
+            reports.append(report)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=sweep) for _ in range(args.runners)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    with app.app_context():
+        second = collect_drive_garbage()
+        account = StorageAccount.query.first()
+        stored = account.reclaimed_bytes
+
+    drive.stop()
+
+    swept = [r for r in reports if r is not None]
+    returned = sum(sum(r.values()) for r in swept)
+    checks = {
+        'orphans_deleted': all(f not in drive.files for f in orphans),
+        'referenced_kept': all(f in drive.files for f in room['file_ids']),
+        'recent_kept': recent in drive.files,
+        'outside_folder_kept': outside in drive.files,
+        'no_double_delete': drive.calls['files.delete'] == args.orphans,
+        'reclaimed_returned': returned == orphan_bytes,
+        'reclaimed_stored': stored == orphan_bytes,
+        'second_sweep_empty': second is not None and sum(second.values()) == 0,
+    }
+
+    report = {
+        'args': vars(args),
+        'seconds': round(elapsed, 4),
+        'sweeps_run': len(swept),
+        'sweeps_skipped': len(reports) - len(swept),
+        'orphan_bytes': orphan_bytes,
+        'reclaimed_returned': returned,
+        'reclaimed_stored': stored,
+        'drive_calls': dict(drive.calls),
+        'checks': checks,
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+    if not all(checks.values()):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
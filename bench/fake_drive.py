@@ -0,0 +1,375 @@
+"""Drive local para benchmarks.
+
+Implementa o subconjunto da API v3 que o app usa: files.list, files.create
+(metadados e upload resumable), permissions.create, files.delete (avulso ou
+em requisições batch multipart), download com alt=media e o endpoint de
+token OAuth. Serve HTTPS com certificado
+autoassinado porque o googleapiclient mantém o esquema https ao trocar o host
+dos uploads.
+
+Uso isolado (apontando o app real para ele):
+
+    python -m bench.fake_drive --port 8765 --latency 0.05
+
+e exporte as variáveis que o comando imprime antes de subir o app.
+"""
+import argparse
+import datetime
+import email.parser
+import ipaddress
+import json
+import os
+import re
+import ssl
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+FOLDER_MIME = 'application/vnd.google-apps.folder'
+
+
+def make_self_signed_cert(directory):
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, 'localhost')])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=5))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(x509.SubjectAlternativeName([
+            x509.DNSName('localhost'),
+            x509.IPAddress(ipaddress.ip_address('127.0.0.1')),
+        ]), critical=False)
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+        .sign(key, hashes.SHA256())
+    )
+
+    cert_path = os.path.join(directory, 'fake_drive.pem')
+    key_path = os.path.join(directory, 'fake_drive.key')
+    with open(cert_path, 'wb') as f:
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, 'wb') as f:
+        f.write(key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption()
+        ))
+    return cert_path, key_path
+
+
+class FakeDrive:
+    """Armazena arquivos em memória e os serve por HTTPS.
+
+    latency: segundos de espera antes de responder qualquer chamada.
+    bandwidth: bytes/s ao transmitir alt=media (None = sem limite).
+    """
+
+    def __init__(self, latency=0.0, bandwidth=None):
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.files = {}
+        self.uploads = {}
+        self.calls = Counter()
+        self.lock = threading.Lock()
+        self.server = None
+        self.cert_dir = tempfile.mkdtemp(prefix='fake_drive_')
+        self.cert_path, self.key_path = make_self_signed_cert(self.cert_dir)
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"https://{host}:{port}"
+
+    def env(self):
+        """Variáveis de ambiente que apontam o app (e suas libs HTTP) para este servidor."""
+        return {
+            'DRIVE_API_URL': self.url,
+            'GOOGLE_TOKEN_URI': f"{self.url}/token",
+            'HTTPLIB2_CA_CERTS': self.cert_path,
+            'REQUESTS_CA_BUNDLE': self.cert_path,
+        }
+
+    def start(self, host='127.0.0.1', port=0):
+        drive = self
+
+        class Handler(FakeDriveHandler):
+            pass
+        Handler.drive = drive
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(self.cert_path, self.key_path)
+        self.server.socket = context.wrap_socket(self.server.socket, server_side=True)
+        threading.Thread(target=self.server.serve_forever, name='fake-drive', daemon=True).start()
+        return self.url
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+
+    def add_file(self, name, data=b'', mime_type='application/octet-stream', parents=None):
+        file_id = uuid.uuid4().hex
+        with self.lock:
+            self.files[file_id] = {
+                'id': file_id,
+                'name': name,
+                'mimeType': mime_type,
+                'parents': parents or [],
+                'data': data,
+                'createdTime': datetime.datetime.now(datetime.timezone.utc).isoformat().replace('+00:00', 'Z'),
+            }
+        return file_id
+
+    def folder_id(self, name='pretitudes'):
+        with self.lock:
+            for f in self.files.values():
+                if f['mimeType'] == FOLDER_MIME and f['name'] == name:
+                    return f['id']
+        return self.add_file(name, mime_type=FOLDER_MIME)
+
+    def describe(self, f):
+        return {
+            'id': f['id'],
+            'name': f['name'],
+            'mimeType': f['mimeType'],
+            'size': str(len(f['data'])),
+            'createdTime': f['createdTime'],
+        }
+
+    def delete_file(self, file_id):
+        with self.lock:
+            return self.files.pop(file_id, None) is not None
+
+    def list_files(self, q):
+        folder = re.search(r"'([^']+)' in parents", q or '')
+        name = re.search(r"name='([^']+)'", q or '')
+        mime = re.search(r"mimeType='([^']+)'", q or '')
+        with self.lock:
+            files = list(self.files.values())
+        if folder:
+            files = [f for f in files if folder.group(1) in f['parents']]
+        if name:
+            files = [f for f in files if f['name'] == name.group(1)]
+        if mime:
+            files = [f for f in files if f['mimeType'] == mime.group(1)]
+        return [self.describe(f) for f in files]
+
+
+class FakeDriveHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    drive = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, payload, status=200, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=UTF-8')
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_error_json(self, status, message):
+        self.send_json({'error': {'code': status, 'message': message}}, status=status)
+
+    def read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length) if length else b''
+
+    def begin(self, operation):
+        self.drive.calls[operation] += 1
+        if self.drive.latency:
+            time.sleep(self.drive.latency)
+        if operation != 'token' and not (self.headers.get('Authorization') or '').startswith('Bearer '):
+            self.send_error_json(401, 'Login Required')
+            return False
+        return True
+
+    def route(self):
+        parts = urlsplit(self.path)
+        return parts.path.rstrip('/'), {k: v[-1] for k, v in parse_qs(parts.query).items()}
+
+    def do_GET(self):
+        path, query = self.route()
+        match = re.fullmatch(r'/drive/v3/files/([^/]+)', path)
+
+        if path == '/drive/v3/files':
+            if self.begin('files.list'):
+                self.send_json({'files': self.drive.list_files(query.get('q'))})
+        elif match and query.get('alt') == 'media':
+            if self.begin('files.get_media'):
+                self.stream_media(match.group(1))
+        elif match:
+            if self.begin('files.get'):
+                f = self.drive.files.get(match.group(1))
+                if f:
+                    self.send_json(self.drive.describe(f))
+                else:
+                    self.send_error_json(404, 'File not found')
+        else:
+            self.send_error_json(404, 'Not found')
+
+    def stream_media(self, file_id):
+        f = self.drive.files.get(file_id)
+        if not f:
+            return self.send_error_json(404, 'File not found')
+
+        data = f['data']
+        self.send_response(200)
+        self.send_header('Content-Type', 'image/jpeg')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+
+        chunk_size = 16 * 1024
+        for start in range(0, len(data), chunk_size):
+            chunk = data[start:start + chunk_size]
+            self.wfile.write(chunk)
+            if self.drive.bandwidth:
+                time.sleep(len(chunk) / self.drive.bandwidth)
+
+    def do_POST(self):
+        path, query = self.route()
+        body = self.read_body()
+        permission = re.fullmatch(r'/drive/v3/files/([^/]+)/permissions', path)
+
+        if path == '/token':
+            if self.begin('token'):
+                self.send_json({'access_token': f"bench-{uuid.uuid4().hex}", 'expires_in': 3600, 'token_type': 'Bearer'})
+        elif path == '/drive/v3/files':
+            if self.begin('files.create'):
+                meta = json.loads(body or b'{}')
+                file_id = self.drive.add_file(meta.get('name', ''), mime_type=meta.get('mimeType', 'application/octet-stream'), parents=meta.get('parents'))
+                self.send_json({'id': file_id})
+        elif path == '/upload/drive/v3/files' and query.get('uploadType') == 'resumable':
+            if self.begin('files.create'):
+                upload_id = uuid.uuid4().hex
+                self.drive.uploads[upload_id] = {'meta': json.loads(body or b'{}'), 'data': b''}
+                location = f"{self.drive.url}/upload/drive/v3/files?uploadType=resumable&upload_id={upload_id}"
+                self.send_json({}, headers={'Location': location})
+        elif path == '/batch/drive/v3':
+            if self.begin('batch'):
+                self.run_batch(body)
+        elif permission:
+            if self.begin('permissions.create'):
+                if permission.group(1) in self.drive.files:
+                    self.send_json({'id': 'anyoneWithLink', 'type': 'anyone', 'role': 'reader'})
+                else:
+                    self.send_error_json(404, 'File not found')
+        else:
+            self.send_error_json(404, 'Not found')
+
+    def run_batch(self, body):
+        """multipart/mixed com uma requisição HTTP por parte; só DELETE de arquivo."""
+        message = email.parser.BytesParser().parsebytes(
+            f"Content-Type: {self.headers.get('Content-Type')}\r\n\r\n".encode() + body
+        )
+        if not message.is_multipart():
+            return self.send_error_json(400, 'Batch request must be multipart/mixed')
+
+        boundary = uuid.uuid4().hex
+        parts = []
+        for part in message.get_payload():
+            request_line = part.get_payload().split('\n', 1)[0].strip()
+            method, target = request_line.split(' ')[:2]
+            match = re.fullmatch(r'/drive/v3/files/([^/?]+)', urlsplit(target).path)
+            if method == 'DELETE' and match:
+                self.drive.calls['files.delete'] += 1
+                if self.drive.delete_file(match.group(1)):
+                    status, payload = '204 No Content', ''
+                else:
+                    status, payload = '404 Not Found', json.dumps({'error': {'code': 404, 'message': 'File not found'}})
+            else:
+                status, payload = '404 Not Found', json.dumps({'error': {'code': 404, 'message': 'Not found'}})
+
+            # O Generator do cliente quebra cabeçalhos longos; desfaz a dobra.
+            content_id = ' '.join((part.get('Content-ID') or '<>').split())[1:-1]
+            parts.append(
+                f"--{boundary}\r\n"
+                "Content-Type: application/http\r\n"
+                f"Content-ID: <response-{content_id}>\r\n\r\n"
+                f"HTTP/1.1 {status}\r\n"
+                "Content-Type: application/json; charset=UTF-8\r\n"
+                f"Content-Length: {len(payload)}\r\n\r\n"
+                f"{payload}\r\n"
+            )
+
+        response = (''.join(parts) + f"--{boundary}--\r\n").encode()
+        self.send_response(200)
+        self.send_header('Content-Type', f"multipart/mixed; boundary={boundary}")
+        self.send_header('Content-Length', str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    def do_PUT(self):
+        path, query = self.route()
+        body = self.read_body()
+        upload = self.drive.uploads.get(query.get('upload_id', ''))
+
+        if path != '/upload/drive/v3/files' or upload is None:
+            return self.send_error_json(404, 'Upload session not found')
+
+        upload['data'] += body
+        total = re.search(r'/(\d+)$', self.headers.get('Content-Range') or '')
+        if total and len(upload['data']) < int(total.group(1)):
+            self.send_response(308)
+            self.send_header('Range', f"bytes=0-{len(upload['data']) - 1}")
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        del self.drive.uploads[query['upload_id']]
+        meta = upload['meta']
+        file_id = self.drive.add_file(meta.get('name', ''), upload['data'], mime_type=self.headers.get('Content-Type') or 'application/octet-stream', parents=meta.get('parents'))
+        self.send_json({'id': file_id})
+
+    def do_DELETE(self):
+        path, _ = self.route()
+        match = re.fullmatch(r'/drive/v3/files/([^/]+)', path)
+        if not match:
+            return self.send_error_json(404, 'Not found')
+        if self.begin('files.delete'):
+            if not self.drive.delete_file(match.group(1)):
+                return self.send_error_json(404, 'File not found')
+            self.send_response(204)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive falso para benchmarks do Pretitudes.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help="segundos por chamada")
+    parser.add_argument('--bandwidth', type=int, default=None, help="bytes/s no download alt=media")
+    args = parser.parse_args()
+
+    drive = FakeDrive(latency=args.latency, bandwidth=args.bandwidth)
+    drive.start(args.host, args.port)
+    for key, value in drive.env().items():
+        print(f"export {key}={value}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        drive.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+"""Gerador de dados para benchmarks: salas com N posts, curtidas e comentários."""
+import io
+import json
+import os
+import random
+import secrets
+import tempfile
+from datetime import datetime, timedelta
+
+from PIL import Image
+
+
+def make_image(seed, size=(800, 600), fmt='JPEG'):
+    """Imagem com ruído determinístico: cada seed gera bytes diferentes (sem deduplicação)."""
+    rng = random.Random(repr(seed))
+    small = Image.new('RGB', (32, 24))
+    small.putdata([(rng.randrange(256), rng.randrange(256), rng.randrange(256)) for _ in range(32 * 24)])
+    img = small.resize(size, Image.BILINEAR)
+    output = io.BytesIO()
+    img.save(output, format=fmt, quality=80)
+    return output.getvalue()
+
+
+def ensure_disposable(db_url, force=False):
+    """Recusa apagar um banco que não seja um SQLite no diretório temporário, salvo com force."""
+    from sqlalchemy.engine import make_url
+
+    url = make_url(db_url)
+    if url.get_backend_name() == 'sqlite':
+        path = url.database
+        if not path or path == ':memory:':
+            return
+        tmp = os.path.realpath(tempfile.gettempdir())
+        if os.path.isabs(path) and os.path.realpath(path).startswith(tmp + os.sep):
+            return
+    if not force:
+        raise SystemExit(f"Recusando apagar {url.render_as_string(hide_password=True)}: "
+                         "não é um banco temporário (use --force).")
+
+
+def seed(app, drive, rooms=1, posts=50, likes=5, comments=3, image_size=(800, 600), force=False):
+    """Apaga e popula o banco do app e o Drive falso.
+
+    O banco precisa ser temporário (ver ensure_disposable) a menos que force=True.
+    Retorna a lista de salas como dicts {hash, code, post_ids, file_ids}.
+    """
+    from app.app import db, User, StorageAccount, Room, RoomMember, Post, PostLike, PostComment, DriveFile, compress_image_if_needed
+
+    ensure_disposable(app.config['SQLALCHEMY_DATABASE_URI'], force)
+    rng = random.Random(1)
+    created = []
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+
+        host = User(username='bench_host', name='Bench Host', is_admin=True)
+        host.set_password('bench')
+        db.session.add(host)
+
+        account = StorageAccount(
+            email='bench@example.com',
+            google_id='bench',
+            tokens=json.dumps({'access_token': 'bench-token', 'refresh_token': 'bench-refresh', 'token_type': 'Bearer'})
+        )
+        db.session.add(account)
+        db.session.flush()
+
+        folder_id = drive.folder_id()
+
+        # Poucas imagens distintas bastam: o proxy só transmite bytes.
+        images = []
+        for i in range(min(posts, 8) or 1):
+            data = make_image(('seed', i), image_size)
+            processed, _, info = compress_image_if_needed(io.BytesIO(data))
+            images.append((processed.getvalue(), info))
+
+        start = datetime.utcnow() - timedelta(days=1)
+        for r in range(rooms):
+            room = Room(
+                hash_id=secrets.token_urlsafe(6),
+                owner_id=host.id,
+                institution='Bench',
+                name=f"Sala {r}",
+                code=f"B{r:05d}"
+            )
+            db.session.add(room)
+
+            guests = [f"Convidado {g}" for g in range(max(likes, comments, 1))]
+            for name in guests:
+                db.session.add(RoomMember(room_hash=room.hash_id, guest_name=name))
+
+            post_objs = []
+            file_ids = []
+            for p in range(posts):
+                data, info = images[p % len(images)]
+                file_id = drive.add_file(f"bench_{r}_{p}.jpg", data, 'image/jpeg', [folder_id])
+                file_ids.append(file_id)
+                db.session.add(DriveFile(
+                    content_hash=f"bench-{file_id}",
+                    drive_file_id=file_id,
+                    storage_account_id=account.id,
+                    ref_count=1,
+                    image_width=info['width'],
+                    image_height=info['height'],
+                    placeholder=info['placeholder']
+                ))
+                when = start + timedelta(seconds=p)
+                post = Post(
+                    room_hash=room.hash_id,
+                    guest_name=rng.choice(guests),
+                    image_url=f"/cdn/{file_id}",
+                    drive_file_id=file_id,
+                    storage_account_id=account.id,
+                    image_width=info['width'],
+                    image_height=info['height'],
+                    placeholder=info['placeholder'],
+                    likes_count=likes,
+                    caption=f"Memória {p}",
+                    created_at=when,
+                    updated_at=when
+                )
+                db.session.add(post)
+                post_objs.append(post)
+            db.session.flush()
+
+            for post in post_objs:
+                for g in range(likes):
+                    db.session.add(PostLike(post_id=post.id, guest_id=f"bench-guest-{g}"))
+                for c in range(comments):
+                    db.session.add(PostComment(
+                        post_id=post.id,
+                        guest_name=guests[c % len(guests)],
+                        guest_id=f"bench-guest-{c}",
+                        text=f"Comentário {c}",
+                        created_at=post.created_at + timedelta(seconds=c)
+                    ))
+
+            created.append({
+                'hash': room.hash_id,
+                'code': room.code,
+                'post_ids': [p.id for p in post_objs],
+                'file_ids': file_ids,
+            })
+
+        db.session.commit()
+
+    return created
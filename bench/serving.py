@@ -0,0 +1,205 @@
+"""Teste de carga do modo de produção: imagens em streaming x rotas de API.
+
+    python -m bench.serving --worker-class sync,gthread,gevent --streams 50
+
+Para cada classe de worker sobe o gunicorn (gunicorn.conf.py) contra o Drive
+falso com banda limitada, mantém --streams downloads de /cdn em paralelo e
+mede a latência de /api/like e /api/comment enquanto isso, comparando com a
+mesma medida sem carga de imagens.
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from bench.__main__ import percentile
+from bench.fake_drive import FakeDrive
+from bench.seed import seed
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(worker_class, env, db_url, args):
+    port = free_port()
+    env = dict(env, WORKER_CLASS=worker_class, WEB_CONCURRENCY=str(args.workers), THREADS=str(args.threads))
+    # O gunicorn aceita a fábrica com argumentos literais: o banco do bench não passa pelo ambiente.
+    app_spec = f"app:create_app({{'SQLALCHEMY_DATABASE_URI': {db_url!r}}})"
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--bind', f"127.0.0.1:{port}", app_spec],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            requests.get(url, timeout=1)
+            return process, url
+        except requests.RequestException:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"gunicorn ({worker_class}) não subiu")
+
+
+def guest_session(url, room):
+    http = requests.Session()
+    http.post(f"{url}/room/{room['hash']}/auth", data={'guest_name': f"Bench {threading.get_ident()}"}, timeout=30)
+    return http
+
+
+def measure_api(url, room, count, concurrency, timeout):
+    """Latência de like/comment intercalados; timeouts e 5xx contam como erro."""
+    local = threading.local()
+    post_ids = room['post_ids']
+
+    def one(i):
+        http = getattr(local, 'http', None)
+        if http is None:
+            http = local.http = guest_session(url, room)
+        post_id = post_ids[i % len(post_ids)]
+        kind = 'like' if i % 2 == 0 else 'comment'
+        started = time.perf_counter()
+        try:
+            if kind == 'like':
+                res = http.post(f"{url}/api/like/{post_id}", timeout=timeout)
+            else:
+                res = http.post(f"{url}/api/comment/{post_id}", json={'text': f"bench {i}"}, timeout=timeout)
+            ok = res.status_code < 500
+        except requests.RequestException:
+            ok = False
+        return kind, time.perf_counter() - started, ok
+
+    results = {'like': [], 'comment': []}
+    errors = {'like': 0, 'comment': 0}
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for kind, elapsed, ok in pool.map(one, range(count)):
+            results[kind].append(elapsed)
+            if not ok:
+                errors[kind] += 1
+
+    summary = {}
+    for kind, latencies in results.items():
+        latencies.sort()
+        summary[kind] = {
+            'requests': len(latencies),
+            'errors': errors[kind],
+            'p50_ms': round(percentile(latencies, 50) * 1000, 1),
+            'p95_ms': round(percentile(latencies, 95) * 1000, 1),
+            'p99_ms': round(percentile(latencies, 99) * 1000, 1),
+        }
+    return summary
+
+
+def stream_images(url, room, streams, stop, outcomes):
+    def loop(n):
+        http = requests.Session()
+        file_ids = room['file_ids']
+        i = n
+        while not stop.is_set():
+            try:
+                with http.get(f"{url}/cdn/{file_ids[i % len(file_ids)]}", stream=True, timeout=60) as res:
+                    for _ in res.iter_content(64 * 1024):
+                        if stop.is_set():
+                            return
+                outcomes.append(res.status_code)
+            except requests.RequestException:
+                outcomes.append(None)
+            i += streams
+
+    threads = [threading.Thread(target=loop, args=(n,), daemon=True) for n in range(streams)]
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+def run_worker_class(worker_class, env, db_url, room, args):
+    process, url = start_server(worker_class, env, db_url, args)
+    try:
+        idle = measure_api(url, room, args.requests, args.api_concurrency, args.timeout)
+
+        stop = threading.Event()
+        outcomes = []
+        threads = stream_images(url, room, args.streams, stop, outcomes)
+        time.sleep(args.warmup)
+        loaded = measure_api(url, room, args.requests, args.api_concurrency, args.timeout)
+        stop.set()
+        for thread in threads:
+            thread.join(timeout=5)
+
+        return {
+            'idle': idle,
+            'under_image_load': loaded,
+            'image_streams': {
+                'completed': sum(1 for status in outcomes if status == 200),
+                'failed': sum(1 for status in outcomes if status != 200),
+            },
+        }
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Streams de imagem x latência da API por classe de worker.")
+    parser.add_argument('--worker-class', default='sync,gthread,gevent', help="lista separada por vírgulas")
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--threads', type=int, default=8, help="threads por worker gthread")
+    parser.add_argument('--streams', type=int, default=50, help="downloads de imagem simultâneos")
+    parser.add_argument('--requests', type=int, default=60, help="likes+comentários medidos por fase")
+    parser.add_argument('--api-concurrency', type=int, default=4)
+    parser.add_argument('--posts', type=int, default=20)
+    parser.add_argument('--drive-bandwidth', type=int, default=64 * 1024, help="bytes/s por download no Drive falso")
+    parser.add_argument('--warmup', type=float, default=1.0, help="segundos de streaming antes de medir")
+    parser.add_argument('--timeout', type=float, default=10.0, help="timeout das requisições de API")
+    parser.add_argument('--output', default=None, help="arquivo JSON (padrão: stdout)")
+    args = parser.parse_args(argv)
+
+    drive = FakeDrive(bandwidth=args.drive_bandwidth)
+    drive.start()
+
+    workdir = tempfile.mkdtemp(prefix='pretitudes_serving_')
+    env = dict(os.environ)
+    env.update(drive.env())
+    env.update({
+        'isProd': 'false',
+        'SECRET_KEY': 'bench',
+    })
+    os.environ.update(env)
+    db_url = f"sqlite:///{os.path.join(workdir, 'serving.db')}"
+
+    from app import create_app
+    room = seed(create_app({'SQLALCHEMY_DATABASE_URI': db_url}), drive, posts=args.posts, likes=2, comments=1)[0]
+
+    results = {}
+    for worker_class in [w.strip() for w in args.worker_class.split(',') if w.strip()]:
+        results[worker_class] = run_worker_class(worker_class, env, db_url, room, args)
+        loaded = results[worker_class]['under_image_load']
+        print(f"{worker_class}: like p95 {loaded['like']['p95_ms']} ms, comment p95 {loaded['comment']['p95_ms']} ms "
+              f"com {args.streams} imagens em streaming", file=sys.stderr)
+
+    drive.stop()
+
+    report = {'args': vars(args), 'worker_classes': results}
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""Benchmark de partida a frio (spawn de worker).
+
+    python -m bench.startup --runs 5 --output startup.json
+
+Cada etapa roda num interpretador novo; o tempo inclui a subida do Python.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+DB_URL = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='pretitudes_startup_'), 'startup.db')}"
+CREATE_APP = f"from app import create_app; app = create_app({{'SQLALCHEMY_DATABASE_URI': {DB_URL!r}}})"
+
+STAGES = {
+    'python': "pass",
+    'import': "import app",
+    'create_app': CREATE_APP,
+    'first_request': f"{CREATE_APP}; app.test_client().get('/')",
+    'preload_heavy_modules': "from app.app import preload_heavy_modules; preload_heavy_modules()",
+}
+
+
+def run_stage(code, env):
+    started = time.perf_counter()
+    subprocess.run([sys.executable, '-c', code], check=True, env=env, stdout=subprocess.DEVNULL)
+    return time.perf_counter() - started
+
+
+def top_imports(code, env, limit=10):
+    """Módulos de primeiro nível que mais pesam, segundo `python -X importtime`."""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], env=env, capture_output=True, text=True, check=True)
+    totals = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line.split('|')
+        # Só módulos de primeiro nível: os aninhados vêm indentados.
+        if cumulative.strip().isdigit() and not name[1:].startswith(' '):
+            totals.append((int(cumulative), name.strip()))
+    return [{'module': name, 'ms': round(us / 1000, 1)} for us, name in sorted(totals, reverse=True)[:limit]]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tempo de partida a frio do Pretitudes.")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--output', default=None, help="arquivo JSON (padrão: stdout)")
+    args = parser.parse_args(argv)
+
+    env = dict(os.environ)
+    env['isProd'] = 'false'
+    env.setdefault('SECRET_KEY', 'bench')
+
+    results = {}
+    for stage, code in STAGES.items():
+        run_stage(code, env)  # aquece o cache de bytecode
+        samples = [run_stage(code, env) for _ in range(args.runs)]
+        results[stage] = {
+            'min_ms': round(min(samples) * 1000, 1),
+            'median_ms': round(statistics.median(samples) * 1000, 1),
+        }
+        print(f"{stage}: mediana {results[stage]['median_ms']} ms", file=sys.stderr)
+
+    report = {
+        'runs': args.runs,
+        'stages': results,
+        'top_imports_create_app': top_imports(STAGES['create_app'], env),
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""Configuração do gunicorn para produção.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Concorrência (variáveis de ambiente):
+
+    WORKER_CLASS        gevent (padrão quando instalado) ou gthread/sync. Com
+                        gevent o streaming do cdn_proxy espera o Drive e o
+                        cliente sem prender uma thread, então dezenas de
+                        imagens carregando não bloqueiam /api/like e
+                        /api/comment.
+    WEB_CONCURRENCY     processos worker (padrão 2; ~1 por CPU).
+    WORKER_CONNECTIONS  requisições simultâneas por worker gevent (padrão 200).
+    THREADS             threads por worker gthread (padrão 8).
+    DB_POOL_SIZE        conexões do banco por worker (padrão 5, mais
+    DB_MAX_OVERFLOW     10 extras). O cdn_proxy devolve a conexão antes de
+                        transmitir, então o pool só cobre as rotas de API.
+    DRIVE_HTTP_POOL_SIZE  conexões keep-alive ao Drive por worker (padrão 50).
+    DRIVE_MEDIA_TIMEOUT   segundos sem dados do Drive antes de desistir (30).
+    PROMETHEUS_MULTIPROC_DIR  onde os workers gravam as métricas que o
+                        /admin/metrics soma (padrão: diretório temporário
+                        por porta). Limpo a cada início do master.
+
+`python -m bench.serving` compara as classes de worker sob carga de imagens.
+O coletor do Drive não roda aqui: use `flask --app wsgi drive-gc --loop` num
+processo à parte ou `flask --app wsgi drive-gc` no cron.
+"""
+import os
+import shutil
+import tempfile
+
+
+def _default_worker_class():
+    try:
+        import gevent  # noqa: F401
+        return 'gevent'
+    except ImportError:
+        return 'gthread'
+
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+# Definido antes do preload para o create_app já ligar o modo multiprocesso.
+os.environ.setdefault(
+    'PROMETHEUS_MULTIPROC_DIR',
+    os.path.join(tempfile.gettempdir(), f"pretitudes_metrics_{os.environ.get('PORT', '8000')}")
+)
+workers = int(os.environ.get("WEB_CONCURRENCY", "2"))
+worker_class = os.environ.get("WORKER_CLASS") or _default_worker_class()
+worker_connections = int(os.environ.get("WORKER_CONNECTIONS", "200"))
+# Com threads > 1 o gunicorn troca sync por gthread; só aplica a quem usa.
+threads = int(os.environ.get("THREADS", "8")) if worker_class == 'gthread' else 1
+timeout = int(os.environ.get("TIMEOUT", "60"))
+keepalive = 5
+
+# Carrega o app (e as dependências pesadas) uma vez no master; os workers
+# herdam tudo via fork em vez de pagar a importação a cada spawn.
+preload_app = True
+
+if worker_class == 'gevent':
+    # Precisa acontecer antes do preload importar ssl/requests/googleapiclient.
+    from gevent import monkey
+    monkey.patch_all()
+
+    try:
+        from psycogreen.gevent import patch_psycopg
+        patch_psycopg()
+    except ImportError:
+        pass
+
+
+def on_starting(server):
+    from app.app import preload_heavy_modules
+    preload_heavy_modules()
+
+    # Retratos de uma execução anterior somariam contadores velhos.
+    directory = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory, exist_ok=True)
+
+
+def post_fork(server, worker):
+    # Com preload_app o app nasce no master; conexões que ele tenha aberto ao
+    # banco não podem ser divididas com os workers. close=False descarta o pool
+    # herdado sem fechar os sockets, que ainda são do master.
+    from app.app import db
+    with server.app.wsgi().app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
@@ -1,4 +1,11 @@
-from app.app import app
+from app import create_app
+from app.app import db, upgrade_schema
+
+app = create_app()
 
 if __name__ == '__main__':
+    # Em produção o esquema é criado/atualizado com `flask --app wsgi init-db`.
+    with app.app_context():
+        db.create_all()
+        upgrade_schema()
     app.run(debug=True, port=5000)